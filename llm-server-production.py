@@ -15,11 +15,14 @@ import signal
 import psutil
 import logging
 import hashlib
+import mmap
+import struct
 import sqlite3
+import threading
 from pathlib import Path
 from contextlib import contextmanager
 from typing import Optional, Dict, Any, List, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field, replace
 from datetime import datetime, timedelta
 
 from flask import Flask, request, jsonify
@@ -37,6 +40,17 @@ logging.basicConfig(
 
 logger = logging.getLogger('llm_server_production_v2')
 
+# Ordem de qualidade das quantizações GGUF (maior = mais fiel ao modelo original)
+QUANTIZATION_QUALITY = {'Q2_K': 1, 'Q3_K_M': 2, 'Q4_K_M': 3, 'Q5_K_M': 4, 'Q6_K': 5, 'Q8_0': 6}
+
+@dataclass
+class QuantizationVariant:
+    """Variante GGUF de um modelo com memória e latência medidas"""
+    quantization: str
+    path: str
+    memory_requirement_gb: float
+    latency_ms: Optional[float] = None  # Latência de referência do /validate em CPU (ms)
+
 @dataclass
 class ModelConfig:
     """Configurações otimizadas para diferentes modelos"""
@@ -50,6 +64,19 @@ class ModelConfig:
     n_threads: int
     n_batch: int
     temperature: float
+    quantization: str = "Q4_K_M"
+    # Variantes em disco; vazio = apenas `path`
+    variants: List[QuantizationVariant] = field(default_factory=list)
+
+    def get_variants(self) -> List[QuantizationVariant]:
+        """Variantes declaradas, da maior para a menor qualidade"""
+        variants = self.variants or [QuantizationVariant(self.quantization, self.path, self.memory_requirement_gb)]
+        return sorted(variants, key=lambda v: QUANTIZATION_QUALITY.get(v.quantization, 0), reverse=True)
+
+    def with_variant(self, variant: QuantizationVariant) -> 'ModelConfig':
+        """Configuração resolvida para uma variante específica"""
+        return replace(self, path=variant.path, memory_requirement_gb=variant.memory_requirement_gb,
+                       quantization=variant.quantization)
 
 @dataclass
 class ValidationDecision:
@@ -64,42 +91,234 @@ class ValidationDecision:
     confidence: float
     reasoning: str
     processing_time_ms: int
+    quantization: Optional[str] = None
+
+@dataclass
+class MaintenanceConfig:
+    """Configuração da manutenção periódica do banco de aprendizado"""
+    enabled: bool = True
+    interval_minutes: float = 60.0
+    ttl_hours: float = 168.0
+    archive_enabled: bool = True
+    archive_path: str = "data/learning-archive.db"
+    batch_size: int = 500
+    vacuum_pages: int = 1000
+    full_vacuum: bool = False
+
+    @classmethod
+    def from_learning_config(cls, learning_config: Dict[str, Any]) -> 'MaintenanceConfig':
+        """Cria configuração a partir da seção `llm.learning` do YAML"""
+        maintenance = learning_config.get('maintenance', {}) or {}
+        cache = learning_config.get('intelligent_cache', {}) or {}
+        defaults = cls()
+        return cls(
+            enabled=maintenance.get('enabled', defaults.enabled),
+            interval_minutes=float(maintenance.get('interval_minutes', defaults.interval_minutes)),
+            ttl_hours=float(cache.get('ttl_hours', defaults.ttl_hours)),
+            archive_enabled=maintenance.get('archive_enabled', defaults.archive_enabled),
+            archive_path=maintenance.get('archive_path', defaults.archive_path),
+            batch_size=int(maintenance.get('batch_size', defaults.batch_size)),
+            vacuum_pages=int(maintenance.get('vacuum_pages', defaults.vacuum_pages)),
+            full_vacuum=bool(maintenance.get('full_vacuum', defaults.full_vacuum))
+        )
+
+DECISIONS_COLUMNS = """
+    id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    csv_value TEXT NOT NULL,
+    web_value TEXT NOT NULL,
+    field_type TEXT NOT NULL,
+    model_used TEXT NOT NULL,
+    match INTEGER NOT NULL,
+    confidence REAL NOT NULL,
+    reasoning TEXT,
+    processing_time_ms INTEGER,
+    hash_key TEXT NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    quantization TEXT
+"""
+
+def migrate_decisions_table(conn: sqlite3.Connection, schema: str = "main"):
+    """Adiciona colunas novas a bancos criados antes delas (sempre no fim, preservando a ordem do SELECT *)"""
+    columns = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info(validation_decisions)")}
+    if 'quantization' not in columns:
+        conn.execute(f"ALTER TABLE {schema}.validation_decisions ADD COLUMN quantization TEXT")
+
+class DecisionSnapshot:
+    """Snapshot binário, ordenado e somente leitura de decisões de alta confiança
+
+    Layout (little-endian, versão 1):
+        cabeçalho  : magic(8s) version(H) model_count(H) record_count(I)
+        modelos    : model_count x [len(B) nome_utf8]
+        registros  : record_count x [hash_key(16s) match(B) model_idx(B) pad(2x) confidence(f) timestamp(I)]
+
+    Os registros são ordenados pelo digest md5 de `hash_key`, permitindo busca
+    binária direto sobre o arquivo mapeado em memória.
+    """
+
+    MAGIC = b'DHSNAP\x00\x01'
+    VERSION = 1
+    HEADER = struct.Struct('<8sHHI')
+    RECORD = struct.Struct('<16sBBxxfI')
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, model_count, self.record_count = self.HEADER.unpack_from(self._mmap, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            self.close()
+            raise ValueError(f"Snapshot inválido ou versão não suportada: {path}")
+
+        offset = self.HEADER.size
+        self.models: List[str] = []
+        for _ in range(model_count):
+            length = self._mmap[offset]
+            self.models.append(self._mmap[offset + 1:offset + 1 + length].decode('utf-8'))
+            offset += 1 + length
+        self._records_offset = offset
+
+    def _record_at(self, index: int) -> Tuple[bytes, int, int, float, int]:
+        return self.RECORD.unpack_from(self._mmap, self._records_offset + index * self.RECORD.size)
+
+    def lookup(self, hash_key: str) -> Optional[Tuple[bool, float, str, datetime]]:
+        """Busca binária por hash_key; retorna (match, confidence, model, timestamp)"""
+        digest = bytes.fromhex(hash_key)
+        low, high = 0, self.record_count
+        while low < high:
+            middle = (low + high) // 2
+            offset = self._records_offset + middle * self.RECORD.size
+            key = self._mmap[offset:offset + 16]
+            if key < digest:
+                low = middle + 1
+            elif key > digest:
+                high = middle
+            else:
+                _, match, model_idx, confidence, timestamp = self._record_at(middle)
+                return bool(match), round(confidence, 4), self.models[model_idx], datetime.fromtimestamp(timestamp)
+        return None
+
+    def entries(self):
+        """Itera sobre todos os registros como (hash_key, match, confidence, model, timestamp)"""
+        for index in range(self.record_count):
+            digest, match, model_idx, confidence, timestamp = self._record_at(index)
+            yield digest.hex(), bool(match), confidence, self.models[model_idx], timestamp
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+    @classmethod
+    def write(cls, path: str, entries: List[Tuple[str, bool, float, str, int]]) -> int:
+        """Grava snapshot a partir de (hash_key, match, confidence, model, timestamp_epoch)"""
+        models: List[str] = []
+        model_index: Dict[str, int] = {}
+        records = []
+        for hash_key, match, confidence, model, timestamp in entries:
+            if model not in model_index:
+                if len(models) >= 255:
+                    raise ValueError("Snapshot suporta no máximo 255 modelos distintos")
+                model_index[model] = len(models)
+                models.append(model)
+            records.append((bytes.fromhex(hash_key), int(match), model_index[model], float(confidence), int(timestamp)))
+        records.sort(key=lambda record: record[0])
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Escrita atômica para que nós lendo o arquivo nunca vejam um snapshot parcial
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(models), len(records)))
+            for model in models:
+                encoded = model.encode('utf-8')[:255]
+                f.write(bytes([len(encoded)]) + encoded)
+            for record in records:
+                f.write(cls.RECORD.pack(*record))
+        os.replace(tmp_path, path)
+
+        return len(records)
+
+    @classmethod
+    def merge(cls, input_paths: List[str], output_path: str) -> int:
+        """Combina snapshots de vários nós mantendo a decisão mais recente por hash_key"""
+        merged: Dict[str, Tuple[str, bool, float, str, int]] = {}
+        for input_path in input_paths:
+            snapshot = cls(input_path)
+            try:
+                for entry in snapshot.entries():
+                    current = merged.get(entry[0])
+                    # Mais recente vence; empate resolvido pela maior confiança
+                    if current is None or (entry[4], entry[2]) > (current[4], current[2]):
+                        merged[entry[0]] = entry
+            finally:
+                snapshot.close()
+
+        return cls.write(output_path, list(merged.values()))
 
 class LearningSystem:
     """Sistema de aprendizado retroativo"""
 
-    def __init__(self, db_path: str = "data/learning.db"):
+    def __init__(self, db_path: str = "data/learning.db", maintenance_config: Optional[MaintenanceConfig] = None,
+                 snapshot_paths: Optional[List[str]] = None):
         self.db_path = db_path
+        self.maintenance_config = maintenance_config or MaintenanceConfig()
+        self.snapshots: List[DecisionSnapshot] = []
+        self.snapshot_hits = 0
+        self.maintenance_stats: Dict[str, Any] = {
+            'runs': 0,
+            'last_run': None,
+            'last_duration_ms': 0,
+            'duplicates_removed': 0,
+            'rows_archived': 0,
+            'rows_expired': 0
+        }
+        self._maintenance_lock = threading.Lock()
+        self._maintenance_stop = threading.Event()
+        self._maintenance_thread: Optional[threading.Thread] = None
+        self._full_vacuum_warned = False
         self.setup_database()
 
+        for path in snapshot_paths or []:
+            self.mount_snapshot(path)
+
+    @staticmethod
+    def _hash_key(csv_value: str, web_value: str, field_type: str) -> str:
+        """Hash único para detectar padrões similares"""
+        return hashlib.md5(
+            f"{csv_value.lower()}:{web_value.lower()}:{field_type}".encode()
+        ).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre conexão com timeout para conviver com a manutenção em background"""
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        conn.execute("PRAGMA busy_timeout = 5000")
+        return conn
+
     def setup_database(self):
         """Configura banco de dados SQLite para armazenar decisões"""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
         with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS validation_decisions (
-                    id TEXT PRIMARY KEY,
-                    timestamp TEXT NOT NULL,
-                    csv_value TEXT NOT NULL,
-                    web_value TEXT NOT NULL,
-                    field_type TEXT NOT NULL,
-                    model_used TEXT NOT NULL,
-                    match INTEGER NOT NULL,
-                    confidence REAL NOT NULL,
-                    reasoning TEXT,
-                    processing_time_ms INTEGER,
-                    hash_key TEXT NOT NULL,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+            # auto_vacuum só tem efeito em bancos novos; bancos existentes são
+            # convertidos pelo VACUUM completo de `--compact` (ou `full_vacuum`)
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            # WAL permite que leituras de requisições continuem durante a manutenção
+            conn.execute("PRAGMA journal_mode = WAL")
+
+            conn.execute(f"CREATE TABLE IF NOT EXISTS validation_decisions ({DECISIONS_COLUMNS})")
+            migrate_decisions_table(conn)
 
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_field_type ON validation_decisions(field_type)
             """)
 
+            # Índice composto atende o lookup por hash_key ordenado por timestamp
+            conn.execute("DROP INDEX IF EXISTS idx_hash_key")
             conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_hash_key ON validation_decisions(hash_key)
+                CREATE INDEX IF NOT EXISTS idx_hash_key_timestamp ON validation_decisions(hash_key, timestamp)
             """)
 
             conn.execute("""
@@ -109,17 +328,14 @@ class LearningSystem:
     def store_decision(self, decision: ValidationDecision):
         """Armazena decisão de validação"""
         try:
-            # Criar hash único para detectar padrões similares
-            hash_key = hashlib.md5(
-                f"{decision.csv_value.lower()}:{decision.web_value.lower()}:{decision.field_type}".encode()
-            ).hexdigest()
+            hash_key = self._hash_key(decision.csv_value, decision.web_value, decision.field_type)
 
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 conn.execute("""
                     INSERT OR REPLACE INTO validation_decisions
                     (id, timestamp, csv_value, web_value, field_type, model_used,
-                     match, confidence, reasoning, processing_time_ms, hash_key)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     match, confidence, reasoning, processing_time_ms, hash_key, quantization)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
                     decision.id,
                     decision.timestamp.isoformat(),
@@ -131,7 +347,8 @@ class LearningSystem:
                     decision.confidence,
                     decision.reasoning,
                     decision.processing_time_ms,
-                    hash_key
+                    hash_key,
+                    decision.quantization
                 ))
 
         except Exception as e:
@@ -140,16 +357,16 @@ class LearningSystem:
     def find_similar_decision(self, csv_value: str, web_value: str, field_type: str, similarity_threshold: float = 0.95) -> Optional[ValidationDecision]:
         """Busca decisão similar baseada em hash"""
         try:
-            hash_key = hashlib.md5(
-                f"{csv_value.lower()}:{web_value.lower()}:{field_type}".encode()
-            ).hexdigest()
+            hash_key = self._hash_key(csv_value, web_value, field_type)
+            cutoff_time = datetime.now() - timedelta(hours=self.maintenance_config.ttl_hours)
+            cutoff = cutoff_time.isoformat()
 
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.execute("""
                     SELECT * FROM validation_decisions
-                    WHERE hash_key = ? AND confidence >= ?
+                    WHERE hash_key = ? AND confidence >= ? AND timestamp >= ?
                     ORDER BY timestamp DESC LIMIT 1
-                """, (hash_key, similarity_threshold))
+                """, (hash_key, similarity_threshold, cutoff))
 
                 row = cursor.fetchone()
                 if row:
@@ -163,15 +380,79 @@ class LearningSystem:
                         match=bool(row[6]),
                         confidence=row[7],
                         reasoning=row[8] or "",
-                        processing_time_ms=row[9] or 0
+                        processing_time_ms=row[9] or 0,
+                        quantization=row[12]
                     )
+
+            # Camada somente leitura abaixo do banco vivo
+            for snapshot in self.snapshots:
+                found = snapshot.lookup(hash_key)
+                if found:
+                    match, confidence, model_used, timestamp = found
+                    if confidence >= similarity_threshold and timestamp >= cutoff_time:
+                        self.snapshot_hits += 1
+                        return ValidationDecision(
+                            id=f"snapshot:{hash_key}",
+                            timestamp=timestamp,
+                            csv_value=csv_value,
+                            web_value=web_value,
+                            field_type=field_type,
+                            model_used=model_used,
+                            match=match,
+                            confidence=confidence,
+                            reasoning=f"snapshot {os.path.basename(snapshot.path)}",
+                            processing_time_ms=0
+                        )
         except Exception as e:
             logger.error(f"Erro ao buscar decisão similar: {e}")
 
         return None
 
-    def get_model_performance(self, model_name: str, field_type: str = None) -> Dict[str, float]:
-        """Retorna métricas de performance do modelo"""
+    def mount_snapshot(self, path: str) -> bool:
+        """Mapeia snapshot em memória como camada de cache somente leitura"""
+        try:
+            snapshot = DecisionSnapshot(path)
+            self.snapshots.append(snapshot)
+            logger.info(f"📦 Snapshot montado: {path} ({snapshot.record_count} decisões)")
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao montar snapshot {path}: {e}")
+            return False
+
+    def export_snapshot(self, path: str, min_confidence: float = 0.9) -> int:
+        """Exporta decisões não expiradas de alta confiança para snapshot binário"""
+        cutoff = (datetime.now() - timedelta(hours=self.maintenance_config.ttl_hours)).isoformat()
+        entries = []
+
+        with self._connect() as conn:
+            # Decisão mais recente por hash_key
+            cursor = conn.execute("""
+                SELECT hash_key, match, confidence, model_used, timestamp FROM (
+                    SELECT hash_key, match, confidence, model_used, timestamp,
+                           ROW_NUMBER() OVER (PARTITION BY hash_key ORDER BY timestamp DESC, rowid DESC) AS position
+                    FROM validation_decisions
+                    WHERE timestamp >= ?
+                )
+                WHERE position = 1 AND confidence >= ?
+            """, (cutoff, min_confidence))
+
+            for hash_key, match, confidence, model_used, timestamp in cursor:
+                epoch = int(datetime.fromisoformat(timestamp).timestamp())
+                entries.append((hash_key, bool(match), confidence, model_used, epoch))
+
+        count = DecisionSnapshot.write(path, entries)
+        logger.info(f"📦 Snapshot exportado: {path} ({count} decisões)")
+        return count
+
+    def close_snapshots(self):
+        """Libera mapeamentos dos snapshots montados"""
+        for snapshot in self.snapshots:
+            snapshot.close()
+        self.snapshots.clear()
+
+    def get_model_performance(self, model_name: str, field_type: str = None,
+                              quantization: str = None) -> Dict[str, float]:
+        """Retorna métricas de performance do modelo (opcionalmente de uma variante)"""
         try:
             with sqlite3.connect(self.db_path) as conn:
                 where_clause = "WHERE model_used = ?"
@@ -181,6 +462,10 @@ class LearningSystem:
                     where_clause += " AND field_type = ?"
                     params.append(field_type)
 
+                if quantization:
+                    where_clause += " AND quantization = ?"
+                    params.append(quantization)
+
                 cursor = conn.execute(f"""
                     SELECT
                         AVG(confidence) as avg_confidence,
@@ -209,6 +494,180 @@ class LearningSystem:
             'high_confidence_rate': 0.0
         }
 
+    def start_maintenance(self):
+        """Inicia thread de manutenção periódica em background"""
+        if not self.maintenance_config.enabled or self._maintenance_thread:
+            return
+
+        def maintenance_loop():
+            interval = max(1.0, self.maintenance_config.interval_minutes * 60)
+            while not self._maintenance_stop.wait(interval):
+                self.run_maintenance()
+
+        self._maintenance_stop.clear()
+        self._maintenance_thread = threading.Thread(
+            target=maintenance_loop, name='learning-maintenance', daemon=True
+        )
+        self._maintenance_thread.start()
+        logger.info(f"🧹 Manutenção do banco de aprendizado a cada {self.maintenance_config.interval_minutes:.0f} min")
+
+    def stop_maintenance(self, timeout: float = 10.0):
+        """Sinaliza parada da thread de manutenção"""
+        self._maintenance_stop.set()
+        if self._maintenance_thread:
+            self._maintenance_thread.join(timeout)
+            self._maintenance_thread = None
+
+    def run_maintenance(self) -> Dict[str, Any]:
+        """Deduplica, arquiva decisões expiradas e compacta o banco
+
+        Cada etapa trabalha em lotes de `batch_size` linhas com transações
+        curtas, para que requisições de /validate não esperem pelo lock.
+        """
+        if not self._maintenance_lock.acquire(blocking=False):
+            return self.maintenance_stats
+
+        start_time = time.time()
+        try:
+            duplicates = self._deduplicate()
+            archived, expired = self._enforce_retention()
+            self._compact()
+
+            self.maintenance_stats['runs'] += 1
+            self.maintenance_stats['last_run'] = datetime.now().isoformat()
+            self.maintenance_stats['last_duration_ms'] = int((time.time() - start_time) * 1000)
+            self.maintenance_stats['duplicates_removed'] += duplicates
+            self.maintenance_stats['rows_archived'] += archived
+            self.maintenance_stats['rows_expired'] += expired
+
+            logger.info(
+                f"🧹 Manutenção concluída: {duplicates} duplicadas, {archived} arquivadas, "
+                f"{expired} expiradas em {self.maintenance_stats['last_duration_ms']}ms"
+            )
+        except Exception as e:
+            logger.error(f"Erro na manutenção do banco de aprendizado: {e}")
+        finally:
+            self._maintenance_lock.release()
+
+        return self.maintenance_stats
+
+    def _deduplicate(self) -> int:
+        """Mantém apenas a decisão mais recente por hash_key
+
+        As duplicadas são levantadas numa única leitura, fora de transação de
+        escrita; a remoção segue em lotes de `batch_size` ids.
+        """
+        removed = 0
+        batch_size = self.maintenance_config.batch_size
+
+        with self._connect() as conn:
+            ids = [row[0] for row in conn.execute("""
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY hash_key ORDER BY timestamp DESC, rowid DESC
+                    ) AS position
+                    FROM validation_decisions
+                )
+                WHERE position > 1
+            """)]
+
+            for start in range(0, len(ids), batch_size):
+                batch = ids[start:start + batch_size]
+                placeholders = ','.join('?' * len(batch))
+                cursor = conn.execute(f"DELETE FROM validation_decisions WHERE id IN ({placeholders})", batch)
+                conn.commit()
+                removed += cursor.rowcount
+
+        return removed
+
+    def _enforce_retention(self) -> Tuple[int, int]:
+        """Move decisões além de ttl_hours para o banco de arquivo (ou as remove)"""
+        config = self.maintenance_config
+        cutoff = (datetime.now() - timedelta(hours=config.ttl_hours)).isoformat()
+        archived = 0
+        expired = 0
+
+        with self._connect() as conn:
+            if config.archive_enabled:
+                archive_dir = os.path.dirname(config.archive_path)
+                if archive_dir:
+                    os.makedirs(archive_dir, exist_ok=True)
+                conn.execute("ATTACH DATABASE ? AS archive", (config.archive_path,))
+                conn.execute(f"CREATE TABLE IF NOT EXISTS archive.validation_decisions ({DECISIONS_COLUMNS})")
+                migrate_decisions_table(conn, "archive")
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS archive.idx_archive_hash_key ON validation_decisions(hash_key)
+                """)
+                conn.commit()
+
+            try:
+                while True:
+                    ids = [row[0] for row in conn.execute("""
+                        SELECT id FROM validation_decisions WHERE timestamp < ? LIMIT ?
+                    """, (cutoff, config.batch_size))]
+                    if not ids:
+                        break
+
+                    placeholders = ','.join('?' * len(ids))
+                    if config.archive_enabled:
+                        conn.execute(f"""
+                            INSERT OR REPLACE INTO archive.validation_decisions
+                            SELECT * FROM main.validation_decisions WHERE id IN ({placeholders})
+                        """, ids)
+                    cursor = conn.execute(
+                        f"DELETE FROM main.validation_decisions WHERE id IN ({placeholders})", ids
+                    )
+                    conn.commit()
+
+                    if config.archive_enabled:
+                        archived += cursor.rowcount
+                    else:
+                        expired += cursor.rowcount
+            finally:
+                if config.archive_enabled:
+                    conn.execute("DETACH DATABASE archive")
+
+        return archived, expired
+
+    def _compact(self):
+        """Libera páginas livres e atualiza estatísticas do planner"""
+        with self._connect() as conn:
+            auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            if auto_vacuum == 2:  # 2 = INCREMENTAL
+                # execute() avança o pragma um único passo (uma página liberada);
+                # executescript() o executa até o fim
+                conn.executescript(f"PRAGMA incremental_vacuum({self.maintenance_config.vacuum_pages});")
+            elif self.maintenance_config.full_vacuum:
+                # Conversão única de bancos criados antes do modo incremental; o
+                # VACUUM completo reescreve o arquivo e bloqueia escritas até terminar
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            elif not self._full_vacuum_warned:
+                self._full_vacuum_warned = True
+                logger.warning(
+                    "⚠️ Banco de aprendizado sem auto_vacuum incremental; páginas livres só são liberadas com "
+                    "`--compact` (offline) ou `full_vacuum: true`"
+                )
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("ANALYZE")
+
+    def get_storage_stats(self) -> Dict[str, Any]:
+        """Retorna tamanho do banco e estatísticas da manutenção"""
+        stats = dict(self.maintenance_stats)
+        try:
+            with self._connect() as conn:
+                stats['hot_rows'] = conn.execute("SELECT COUNT(*) FROM validation_decisions").fetchone()[0]
+                page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+                page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+                freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                stats['db_size_bytes'] = page_count * page_size
+                stats['free_bytes'] = freelist * page_size
+            archive_path = Path(self.maintenance_config.archive_path)
+            stats['archive_size_bytes'] = archive_path.stat().st_size if archive_path.exists() else 0
+        except Exception as e:
+            logger.error(f"Erro ao obter estatísticas do banco: {e}")
+        return stats
+
 class ModelSelector:
     """Seletor inteligente de modelos baseado em configuração"""
 
@@ -243,7 +702,9 @@ class ModelSelector:
         # Último recurso: primeiro modelo disponível
         return available_models[0] if available_models else None
 
-# Modelos recomendados em ordem de capacidade
+# Modelos recomendados em ordem de capacidade. `path` e `memory_requirement_gb`
+# descrevem a variante padrão (Q4_K_M); `variants` lista as quantizações que
+# o seletor pode usar quando há pouca memória ou a latência alvo é apertada
 SUPPORTED_MODELS = [
     ModelConfig(
         name="tinyllama",
@@ -255,7 +716,12 @@ SUPPORTED_MODELS = [
         n_ctx=1024,
         n_threads=2,
         n_batch=64,
-        temperature=0.2
+        temperature=0.2,
+        variants=[
+            QuantizationVariant("Q2_K", "models/tinyllama-1.1b-chat-v1.0.Q2_K.gguf", 1.3, 120),
+            QuantizationVariant("Q4_K_M", "models/tinyllama-1.1b-chat-v1.0.Q4_K_M.gguf", 1.5, 150),
+            QuantizationVariant("Q8_0", "models/tinyllama-1.1b-chat-v1.0.Q8_0.gguf", 2.0, 220)
+        ]
     ),
     ModelConfig(
         name="qwen-1.8b",
@@ -267,7 +733,13 @@ SUPPORTED_MODELS = [
         n_ctx=2048,
         n_threads=2,
         n_batch=128,
-        temperature=0.1
+        temperature=0.1,
+        variants=[
+            QuantizationVariant("Q2_K", "models/qwen1.5-1.8b-chat.Q2_K.gguf", 1.6, 200),
+            QuantizationVariant("Q3_K_M", "models/qwen1.5-1.8b-chat.Q3_K_M.gguf", 1.8, 230),
+            QuantizationVariant("Q4_K_M", "models/qwen1.5-1.8b-chat.Q4_K_M.gguf", 2.0, 260),
+            QuantizationVariant("Q8_0", "models/qwen1.5-1.8b-chat.Q8_0.gguf", 2.8, 380)
+        ]
     ),
     ModelConfig(
         name="gemma-2b",
@@ -279,7 +751,13 @@ SUPPORTED_MODELS = [
         n_ctx=2048,
         n_threads=3,
         n_batch=128,
-        temperature=0.1
+        temperature=0.1,
+        variants=[
+            QuantizationVariant("Q2_K", "models/gemma-2b-it.Q2_K.gguf", 2.0, 260),
+            QuantizationVariant("Q3_K_M", "models/gemma-2b-it.Q3_K_M.gguf", 2.2, 300),
+            QuantizationVariant("Q4_K_M", "models/gemma-2b-it.Q4_K_M.gguf", 2.5, 340),
+            QuantizationVariant("Q8_0", "models/gemma-2b-it.Q8_0.gguf", 3.5, 520)
+        ]
     ),
     ModelConfig(
         name="phi3-mini",
@@ -291,7 +769,13 @@ SUPPORTED_MODELS = [
         n_ctx=4096,
         n_threads=3,
         n_batch=128,
-        temperature=0.1
+        temperature=0.1,
+        variants=[
+            QuantizationVariant("Q2_K", "models/phi-3-mini-4k-instruct.Q2_K.gguf", 2.5, 450),
+            QuantizationVariant("Q3_K_M", "models/phi-3-mini-4k-instruct.Q3_K_M.gguf", 3.0, 520),
+            QuantizationVariant("Q4_K_M", "models/phi-3-mini-4k-instruct.Q4_K_M.gguf", 3.5, 600),
+            QuantizationVariant("Q8_0", "models/phi-3-mini-4k-instruct.Q8_0.gguf", 5.2, 950)
+        ]
     )
 ]
 
@@ -299,8 +783,13 @@ class ProductionLLMServerV2:
     def __init__(self):
         self.models: Dict[str, Llama] = {}  # Cache de modelos carregados
         self.current_model_config: Optional[ModelConfig] = None
+        self.loaded_variants: Dict[str, ModelConfig] = {}  # Variante em uso por modelo carregado
         self.model_selector = ModelSelector()
-        self.learning_system = LearningSystem()
+        learning_config = self.model_selector.config.get('llm', {}).get('learning', {})
+        self.learning_system = LearningSystem(
+            maintenance_config=MaintenanceConfig.from_learning_config(learning_config),
+            snapshot_paths=(learning_config.get('snapshots', {}) or {}).get('paths', [])
+        )
         self.app = Flask(__name__)
         self.setup_routes()
         self.setup_signal_handlers()
@@ -324,24 +813,50 @@ class ProductionLLMServerV2:
         except:
             return 0.0
 
+    def select_variant(self, model: ModelConfig, memory_budget_gb: float) -> Optional[QuantizationVariant]:
+        """Melhor variante em disco que cabe no orçamento de memória e na latência alvo
+
+        Entre as que cabem, vence a de maior qualidade dentro de `latency_target_ms`;
+        se nenhuma atende a latência, a mais rápida.
+        """
+        latency_target = self.model_selector.auto_selection.get('latency_target_ms')
+        fitting = [
+            variant for variant in model.get_variants()
+            if variant.memory_requirement_gb <= memory_budget_gb and Path(variant.path).exists()
+        ]
+        if not fitting:
+            return None
+
+        within_target = [
+            variant for variant in fitting
+            if latency_target is None or variant.latency_ms is None or variant.latency_ms <= latency_target
+        ]
+        if within_target:
+            return within_target[0]
+        return min(fitting, key=lambda variant: variant.latency_ms)
+
     def get_available_models(self) -> List[ModelConfig]:
-        """Lista modelos que cabem na memória e existem no disco"""
+        """Lista modelos que cabem na memória e existem no disco, já resolvidos para a melhor variante"""
         available_memory = self.get_available_memory_gb()
         memory_threshold = self.model_selector.auto_selection.get('memory_threshold_gb', 0.5)
 
         available_models = []
         for model in SUPPORTED_MODELS:
-            # Verificar se há memória suficiente
-            if model.memory_requirement_gb <= (available_memory - memory_threshold):
-                # Verificar se arquivo existe
-                model_path = Path(model.path)
-                if model_path.exists():
-                    available_models.append(model)
-                    logger.info(f"✅ Modelo disponível: {model.name} ({model.description})")
-                else:
-                    logger.info(f"⚠️ Modelo não encontrado: {model.path}")
+            # Modelo já carregado continua na variante carregada (a memória já está em uso)
+            loaded = self.loaded_variants.get(model.name)
+            if loaded and model.name in self.models:
+                available_models.append(loaded)
+                continue
+
+            variant = self.select_variant(model, available_memory - memory_threshold)
+            if variant:
+                available_models.append(model.with_variant(variant))
+                logger.info(f"✅ Modelo disponível: {model.name} [{variant.quantization}] ({model.description})")
+            elif not any(Path(v.path).exists() for v in model.get_variants()):
+                logger.info(f"⚠️ Modelo não encontrado: {model.path}")
             else:
-                logger.info(f"❌ Modelo requer muita RAM: {model.name} ({model.memory_requirement_gb:.1f}GB)")
+                smallest = min(v.memory_requirement_gb for v in model.get_variants())
+                logger.info(f"❌ Modelo requer muita RAM: {model.name} ({smallest:.1f}GB na menor variante)")
 
         return available_models
 
@@ -394,7 +909,7 @@ class ProductionLLMServerV2:
                 return True
 
             with self.safe_model_loading():
-                logger.info(f"📚 Carregando {model_config.name}: {model_config.path}")
+                logger.info(f"📚 Carregando {model_config.name} [{model_config.quantization}]: {model_config.path}")
                 logger.info(f"🔧 Configurações: ctx={model_config.n_ctx}, threads={model_config.n_threads}, batch={model_config.n_batch}")
 
                 # Configurações ultra conservadoras
@@ -429,6 +944,7 @@ class ProductionLLMServerV2:
 
                 if test_response and 'choices' in test_response:
                     self.current_model_config = model_config
+                    self.loaded_variants[model_config.name] = model_config
                     logger.info(f"✅ Modelo {model_config.name} funcional!")
                     return True
                 else:
@@ -440,6 +956,7 @@ class ProductionLLMServerV2:
             # Limpar modelo defeituoso do cache
             if model_config.name in self.models:
                 del self.models[model_config.name]
+            self.loaded_variants.pop(model_config.name, None)
             return False
 
     def setup_routes(self):
@@ -457,6 +974,8 @@ class ProductionLLMServerV2:
                     'models_loaded': loaded_models,
                     'models_available': [m.name for m in available_models],
                     'current_model': self.current_model_config.name if self.current_model_config else None,
+                    'current_quantization': self.current_model_config.quantization if self.current_model_config else None,
+                    'loaded_quantizations': {name: config.quantization for name, config in self.loaded_variants.items()},
                     'current_model_description': self.current_model_config.description if self.current_model_config else None,
                     'timestamp': time.time(),
                     'memory_usage': f"{psutil.virtual_memory().percent:.1f}%",
@@ -474,24 +993,47 @@ class ProductionLLMServerV2:
             """Lista modelos disponíveis com métricas"""
             try:
                 available_memory = self.get_available_memory_gb()
+                memory_threshold = self.model_selector.auto_selection.get('memory_threshold_gb', 0.5)
+                latency_target = self.model_selector.auto_selection.get('latency_target_ms')
+                available = {config.name: config for config in self.get_available_models()}
                 models_info = []
 
                 for model in SUPPORTED_MODELS:
-                    model_path = Path(model.path)
+                    # Variante que o seletor usaria agora (ou a padrão, se nenhuma cabe)
+                    selected = available.get(model.name)
+                    current = selected or model
                     performance = self.learning_system.get_model_performance(model.name)
 
                     models_info.append({
                         'name': model.name,
                         'description': model.description,
-                        'path': model.path,
-                        'memory_requirement_gb': model.memory_requirement_gb,
-                        'file_exists': model_path.exists(),
-                        'can_load': model.memory_requirement_gb <= available_memory and model_path.exists(),
+                        'path': current.path,
+                        'quantization': current.quantization if selected else None,
+                        'memory_requirement_gb': current.memory_requirement_gb,
+                        'file_exists': Path(current.path).exists(),
+                        'can_load': selected is not None,
                         'is_loaded': model.name in self.models,
                         'is_current': self.current_model_config and self.current_model_config.name == model.name,
                         'strengths': model.strengths,
                         'optimal_for': model.optimal_for,
                         'performance': performance,
+                        'variants': [
+                            {
+                                'quantization': variant.quantization,
+                                'path': variant.path,
+                                'memory_requirement_gb': variant.memory_requirement_gb,
+                                'latency_ms': variant.latency_ms,
+                                'file_exists': Path(variant.path).exists(),
+                                'fits_memory': variant.memory_requirement_gb <= available_memory - memory_threshold,
+                                'meets_latency_target': latency_target is None or variant.latency_ms is None
+                                                        or variant.latency_ms <= latency_target,
+                                'is_selected': bool(selected) and selected.quantization == variant.quantization,
+                                'performance': self.learning_system.get_model_performance(
+                                    model.name, quantization=variant.quantization
+                                )
+                            }
+                            for variant in model.get_variants()
+                        ],
                         'settings': {
                             'context_size': model.n_ctx,
                             'threads': model.n_threads,
@@ -502,6 +1044,7 @@ class ProductionLLMServerV2:
 
                 return jsonify({
                     'available_memory_gb': available_memory,
+                    'latency_target_ms': latency_target,
                     'models': models_info,
                     'field_type_mapping': self.model_selector.field_type_mapping
                 }), 200
@@ -541,6 +1084,7 @@ class ProductionLLMServerV2:
                         'csv_value': csv_value,
                         'web_value': web_value,
                         'model_used': f"cache({similar_decision.model_used})",
+                        'quantization': similar_decision.quantization,
                         'processing_time_ms': processing_time,
                         'from_cache': True
                     }), 200
@@ -622,7 +1166,8 @@ Are they the same? Answer: YES or NO"""
                         match=match,
                         confidence=confidence,
                         reasoning=reasoning,
-                        processing_time_ms=processing_time
+                        processing_time_ms=processing_time,
+                        quantization=model_config.quantization
                     )
 
                     # Só armazenar se confiança for alta o suficiente
@@ -636,6 +1181,7 @@ Are they the same? Answer: YES or NO"""
                         'csv_value': csv_value,
                         'web_value': web_value,
                         'model_used': model_config.name,
+                        'quantization': model_config.quantization,
                         'field_type': field_type,
                         'processing_time_ms': processing_time,
                         'from_cache': False
@@ -678,6 +1224,15 @@ Are they the same? Answer: YES or NO"""
                 for model in SUPPORTED_MODELS:
                     metrics_data['models_performance'][model.name] = self.learning_system.get_model_performance(model.name)
 
+                metrics_data['learning_storage'] = self.learning_system.get_storage_stats()
+                metrics_data['learning_snapshots'] = {
+                    'mounted': [
+                        {'path': snapshot.path, 'decisions': snapshot.record_count}
+                        for snapshot in self.learning_system.snapshots
+                    ],
+                    'hits': self.learning_system.snapshot_hits
+                }
+
                 return jsonify(metrics_data), 200
             except Exception as e:
                 logger.error(f"❌ Erro nas métricas: {e}")
@@ -686,10 +1241,13 @@ Are they the same? Answer: YES or NO"""
     def cleanup(self):
         """Limpeza de recursos"""
         try:
+            self.learning_system.stop_maintenance()
+            self.learning_system.close_snapshots()
             logger.info("🧹 Limpando modelos...")
             for model_name in list(self.models.keys()):
                 del self.models[model_name]
             self.models.clear()
+            self.loaded_variants.clear()
             gc.collect()
             logger.info("✅ Limpeza concluída")
         except Exception as e:
@@ -714,7 +1272,9 @@ Are they the same? Answer: YES or NO"""
             else:
                 logger.info(f"✅ {len(available_models)} modelos disponíveis")
                 for model in available_models:
-                    logger.info(f"   • {model.name}: {model.description}")
+                    logger.info(f"   • {model.name} [{model.quantization}]: {model.description}")
+
+            self.learning_system.start_maintenance()
 
             logger.info(f"🌐 Iniciando servidor HTTP em 127.0.0.1:8000")
 
@@ -737,6 +1297,39 @@ Are they the same? Answer: YES or NO"""
 
 def main():
     """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='DataHawk LLM Server v2.0')
+    parser.add_argument('--export-snapshot', metavar='PATH',
+                        help='Exporta decisões de alta confiança para snapshot e sai')
+    parser.add_argument('--min-confidence', type=float, default=0.9,
+                        help='Confiança mínima das decisões exportadas')
+    parser.add_argument('--merge-snapshots', nargs='+', metavar='PATH',
+                        help='Combina snapshots de vários nós (use com --output)')
+    parser.add_argument('--output', metavar='PATH', help='Arquivo de saída do merge')
+    parser.add_argument('--compact', action='store_true',
+                        help='Executa a manutenção com VACUUM completo (servidor parado) e sai')
+    args = parser.parse_args()
+
+    if args.compact:
+        learning_config = ModelSelector().config.get('llm', {}).get('learning', {})
+        maintenance_config = replace(MaintenanceConfig.from_learning_config(learning_config), full_vacuum=True)
+        LearningSystem(maintenance_config=maintenance_config).run_maintenance()
+        return True
+
+    if args.export_snapshot:
+        learning_config = ModelSelector().config.get('llm', {}).get('learning', {})
+        learning_system = LearningSystem(maintenance_config=MaintenanceConfig.from_learning_config(learning_config))
+        learning_system.export_snapshot(args.export_snapshot, args.min_confidence)
+        return True
+
+    if args.merge_snapshots:
+        if not args.output:
+            parser.error('--merge-snapshots requer --output')
+        count = DecisionSnapshot.merge(args.merge_snapshots, args.output)
+        logger.info(f"📦 Snapshot combinado: {args.output} ({count} decisões)")
+        return True
+
     server = ProductionLLMServerV2()
     return server.run()
 
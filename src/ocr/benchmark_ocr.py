@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+OCR benchmark for the Python OCR Service
+Renders synthetic field images (names, CPFs, currency, dates, accented text)
+with PIL, runs them through PythonOCRService.perform_ocr under each option
+profile and reports throughput, latency, memory and character error rate as
+JSON
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import tempfile
+import threading
+import tracemalloc
+import subprocess
+import importlib.util
+from io import BytesIO
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPT_DIR.parent.parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from ocr_matching import edit_distance
+
+# Option profiles compared by the benchmark (merged over language/psm per sample)
+PROFILES = {
+    'default': {},
+    'auto-fast': {'auto': True, 'profile': 'fast'},
+    'auto-accurate': {'auto': True, 'profile': 'accurate'},
+    'denoise-contrast': {'denoise': True, 'enhance_contrast': True},
+    'threshold': {'threshold': True},
+    'scale-2x': {'scale': 2}
+}
+
+FONT_CANDIDATES = [
+    'DejaVuSans.ttf', 'DejaVuSerif.ttf', 'DejaVuSansMono.ttf', 'LiberationSans-Regular.ttf',
+    'LiberationSerif-Regular.ttf', 'Arial.ttf', 'Verdana.ttf', 'Times New Roman.ttf'
+]
+FONT_DIRS = ['/usr/share/fonts', '/usr/local/share/fonts', '/Library/Fonts', '/System/Library/Fonts',
+             'C:/Windows/Fonts']
+
+FIRST_NAMES = ['João', 'Maria', 'José', 'Ana', 'Antônio', 'Francisca', 'Luís', 'Conceição', 'Sebastião', 'Márcia']
+LAST_NAMES = ['Silva', 'Conceição', 'Gonçalves', 'Araújo', 'Magalhães', 'Simões', 'Patrício', 'Ribeiro']
+WORDS = ['ação', 'informação', 'endereço', 'número', 'pagamento', 'crédito', 'saída', 'cônjuge', 'referência']
+
+def load_service_module():
+    """Import python-ocr-service.py (hyphenated, so not importable by name)"""
+    spec = importlib.util.spec_from_file_location('python_ocr_service', SCRIPT_DIR / 'python-ocr-service.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def find_fonts() -> List[str]:
+    fonts = []
+    for font_dir in FONT_DIRS:
+        if not os.path.isdir(font_dir):
+            continue
+        for root, _, names in os.walk(font_dir):
+            fonts.extend(os.path.join(root, name) for name in names if name in FONT_CANDIDATES)
+    return sorted(set(fonts))
+
+def cpf(rng: random.Random) -> str:
+    """A CPF with valid check digits, formatted 000.000.000-00"""
+    digits = [rng.randint(0, 9) for _ in range(9)]
+    for length in (9, 10):
+        total = sum(digit * weight for digit, weight in zip(digits, range(length + 1, 1, -1)))
+        digits.append((total * 10 % 11) % 10)
+    text = ''.join(map(str, digits))
+    return f"{text[:3]}.{text[3:6]}.{text[6:9]}-{text[9:]}"
+
+def currency(rng: random.Random) -> str:
+    value = f"{rng.randint(0, 999999) / 100:,.2f}"
+    return 'R$ ' + value.replace(',', '_').replace('.', ',').replace('_', '.')
+
+def field_value(category: str, rng: random.Random) -> str:
+    if category == 'name':
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+    if category == 'cpf':
+        return cpf(rng)
+    if category == 'currency':
+        return currency(rng)
+    if category == 'date':
+        return f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(1950, 2030)}"
+    return ' '.join(rng.choice(WORDS) for _ in range(3))
+
+def render_sample(text: str, font_path: Optional[str], size: int, noise: float, blur: float) -> bytes:
+    """Render one line of dark text on a light background and encode it as PNG"""
+    font = ImageFont.truetype(font_path, size) if font_path else ImageFont.load_default(size=size)
+    left, top, right, bottom = font.getbbox(text)
+    padding = size // 2
+    image = Image.new('L', (right - left + 2 * padding, bottom - top + 2 * padding), 245)
+    ImageDraw.Draw(image).text((padding - left, padding - top), text, font=font, fill=20)
+
+    if blur:
+        image = image.filter(ImageFilter.GaussianBlur(blur))
+    if noise:
+        pixels = np.asarray(image, dtype=np.float32)
+        pixels += np.random.default_rng(len(text) * size).normal(0, noise, pixels.shape)
+        image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+    buffer = BytesIO()
+    image.convert('RGB').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def build_corpus(count: int, seed: int) -> List[Dict[str, Any]]:
+    """Deterministic corpus of rendered fields with ground truth"""
+    rng = random.Random(seed)
+    fonts = find_fonts() or [None]
+    categories = ['name', 'cpf', 'currency', 'date', 'accents']
+    corpus = []
+    for index in range(count):
+        category = categories[index % len(categories)]
+        text = field_value(category, rng)
+        font_path = rng.choice(fonts)
+        size = rng.choice([14, 18, 24, 32])
+        noise = rng.choice([0, 0, 8, 16])
+        blur = rng.choice([0, 0, 0.6, 1.0])
+        corpus.append({
+            'id': index,
+            'category': category,
+            'text': text,
+            # Accented fields use the bundled Portuguese model
+            'language': 'por' if category in ('name', 'accents') else 'eng',
+            'font': os.path.basename(font_path) if font_path else 'default',
+            'size': size,
+            'noise': noise,
+            'blur': blur,
+            'image': render_sample(text, font_path, size, noise, blur)
+        })
+    return corpus
+
+def prepare_tessdata(tessdata_dir: Optional[str]) -> Optional[str]:
+    """Point Tesseract at a tessdata dir that includes the bundled por.traineddata
+
+    When the system install lacks `por`, system models and the bundled
+    por.traineddata are linked into a temporary directory.
+    """
+    if tessdata_dir:
+        os.environ['TESSDATA_PREFIX'] = tessdata_dir
+        return tessdata_dir
+
+    bundled = REPO_ROOT / 'por.traineddata'
+    try:
+        listing = subprocess.run(['tesseract', '--list-langs'], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    output = listing.stdout + listing.stderr
+    if 'por' in output.split() or not bundled.exists():
+        return None
+
+    system_dir = output.split('"')[1] if output.count('"') >= 2 else None
+    merged_dir = tempfile.mkdtemp(prefix='ocr-bench-tessdata-')
+    if system_dir and os.path.isdir(system_dir):
+        for name in os.listdir(system_dir):
+            os.symlink(os.path.join(system_dir, name), os.path.join(merged_dir, name))
+    shutil.copy(bundled, os.path.join(merged_dir, 'por.traineddata'))
+    os.environ['TESSDATA_PREFIX'] = merged_dir
+    return merged_dir
+
+def character_error_rate(expected: str, actual: str) -> float:
+    expected = ' '.join(expected.split())
+    actual = ' '.join(actual.split())
+    return edit_distance(expected, actual) / max(1, len(expected))
+
+def run_profile(service, corpus: List[Dict[str, Any]], profile_options: Dict[str, Any],
+                concurrency: int, memory_samples: int = 0) -> Dict[str, Any]:
+    """Run the corpus once under a profile and summarize it
+
+    Throughput and latency come from an untraced pass; Python allocation peaks
+    come from a separate tracemalloc pass over the first `memory_samples` images.
+    """
+    def run_sample(sample: Dict[str, Any]) -> Dict[str, Any]:
+        options = {'language': sample['language'], 'psm': 7, 'cache': False, **profile_options}
+        start_time = time.perf_counter()
+        try:
+            text = service.perform_ocr(sample['image'], options)['text']
+            error = None
+        except Exception as e:
+            text, error = '', str(e)
+        return {
+            'latencyMs': (time.perf_counter() - start_time) * 1000,
+            'cer': character_error_rate(sample['text'], text),
+            'exact': ' '.join(text.split()) == sample['text'],
+            'error': error
+        }
+
+    # RSS is sampled during this pass only, so each profile reports its own peak
+    with RssSampler() as rss:
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(run_sample, corpus))
+        elapsed = time.perf_counter() - start_time
+
+    traced_peak = None
+    if memory_samples:
+        tracemalloc.start()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(run_sample, corpus[:memory_samples]))
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    latencies = np.array([outcome['latencyMs'] for outcome in outcomes])
+    cer_by_category: Dict[str, List[float]] = {}
+    for sample, outcome in zip(corpus, outcomes):
+        cer_by_category.setdefault(sample['category'], []).append(outcome['cer'])
+
+    return {
+        'images': len(corpus),
+        'imagesPerSecond': round(len(corpus) / elapsed, 2) if elapsed else None,
+        'latencyMs': {
+            'mean': round(float(latencies.mean()), 2),
+            'p50': round(float(np.percentile(latencies, 50)), 2),
+            'p95': round(float(np.percentile(latencies, 95)), 2),
+            'max': round(float(latencies.max()), 2)
+        },
+        'cer': round(float(np.mean([outcome['cer'] for outcome in outcomes])), 4),
+        'cerByCategory': {category: round(float(np.mean(values)), 4) for category, values in cer_by_category.items()},
+        'exactMatchRate': round(sum(outcome['exact'] for outcome in outcomes) / len(outcomes), 4),
+        'errors': sum(1 for outcome in outcomes if outcome['error']),
+        # Python/NumPy allocations (traced pass); native Tesseract/OpenCV memory shows in the RSS fields
+        'peakTracedMB': round(traced_peak / (1024 * 1024), 2) if traced_peak is not None else None,
+        'startRssMB': round(rss.start, 2) if rss.start is not None else None,
+        'peakRssMB': round(rss.peak, 2) if rss.peak is not None else None
+    }
+
+def current_rss_mb() -> Optional[float]:
+    """Current resident set size from /proc/self/statm, or psutil elsewhere (None if neither)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+class RssSampler:
+    """Peak RSS while the block runs, polled on a background thread
+
+    Unlike ru_maxrss, which is the high-water mark of the whole process,
+    this only covers the block, so later profiles don't inherit the peak of
+    earlier ones.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.start: Optional[float] = None
+        self.peak: Optional[float] = None
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.poll, daemon=True)
+
+    def sample(self):
+        rss = current_rss_mb()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def poll(self):
+        while not self.stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self) -> 'RssSampler':
+        self.start = current_rss_mb()
+        self.peak = self.start
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop.set()
+        self.thread.join()
+        self.sample()
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the Python OCR Service on synthetic fields')
+    parser.add_argument('--samples', type=int, default=100, help='Rendered field images in the corpus')
+    parser.add_argument('--seed', type=int, default=1234, help='Corpus random seed')
+    parser.add_argument('--profiles', default=','.join(PROFILES),
+                        help=f"Comma-separated profiles to run ({', '.join(PROFILES)})")
+    parser.add_argument('--concurrency', type=int, default=1, help='Images processed at once')
+    parser.add_argument('--memory-samples', type=int, default=20,
+                        help='Images rerun under tracemalloc after each timed pass (0 skips it)')
+    parser.add_argument('--tessdata-dir', default=None,
+                        help='Tesseract tessdata directory (default: system, plus the bundled por.traineddata)')
+    parser.add_argument('--output', default=None, help='Write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    unknown = [name for name in args.profiles.split(',') if name not in PROFILES]
+    if unknown:
+        parser.error(f"Unknown profile(s): {', '.join(unknown)}")
+
+    tessdata = prepare_tessdata(args.tessdata_dir)
+    service_module = load_service_module()
+    service = service_module.PythonOCRService(cache_entries=0)
+
+    corpus = build_corpus(args.samples, args.seed)
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'tesseract': str(service_module.pytesseract.get_tesseract_version()),
+            'tesserocr': service.engine_pool.available,
+            'tessdata': tessdata or os.environ.get('TESSDATA_PREFIX')
+        },
+        'corpus': {
+            'samples': len(corpus),
+            'seed': args.seed,
+            'categories': sorted({sample['category'] for sample in corpus}),
+            'fonts': sorted({sample['font'] for sample in corpus})
+        },
+        'concurrency': args.concurrency,
+        'profiles': {}
+    }
+
+    try:
+        # One untimed pass warms engines and traineddata loads
+        run_profile(service, corpus[:5], {}, 1)
+        for name in args.profiles.split(','):
+            report['profiles'][name] = {'options': PROFILES[name],
+                                        **run_profile(service, corpus, PROFILES[name], args.concurrency,
+                                                      args.memory_samples)}
+    finally:
+        service.stop()
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output, encoding='utf-8')
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
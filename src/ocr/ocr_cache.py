@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Content-addressed OCR result cache for the Python OCR Service
+Keys results by the decoded pixels plus the normalized OCR options, with an
+optional perceptual-hash tier for visually identical re-encoded screenshots
+"""
+
+import os
+import copy
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Options that change the OCR output, with the defaults perform_ocr applies
+OPTION_DEFAULTS = {
+    'language': 'eng',
+    'psm': 6,
+    'oem': 3,
+    'whitelist': None,
+    'blacklist': None,
+    'grayscale': True,
+    'denoise': False,
+    'denoise_method': None,
+    'denoise_strength': 3,
+    'enhance_contrast': False,
+    'threshold': False,
+    'scale': 1,
+    'auto': False,
+    'profile': 'fast',
+    'detect_text': False,
+    'tiling': False,
+    'tile_height': 1200,
+    'tile_overlap': 100,
+    'format': 'objects',
+    'word_detail': True,
+    'crop_region': None,
+    'engine': 'auto'
+}
+
+def normalize_options(options: Dict[str, Any]) -> str:
+    """Canonical JSON of the result-affecting options (defaults filled in)"""
+    normalized = {key: options.get(key, default) for key, default in OPTION_DEFAULTS.items()}
+    for key in ('psm', 'oem'):
+        normalized[key] = int(normalized[key])
+    normalized['scale'] = float(normalized['scale'] or 1)
+    normalized['denoise_strength'] = float(normalized['denoise_strength'])
+    return json.dumps(normalized, sort_keys=True, separators=(',', ':'))
+
+def perceptual_hash(image: np.ndarray) -> int:
+    """64-bit difference hash of the image"""
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view('>u8')[0])
+
+class OCRResultCache:
+    """LRU, size-bounded OCR result cache with optional perceptual and disk tiers"""
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 64 * 1024 * 1024,
+                 phash_distance: Optional[int] = None, disk_dir: Optional[str] = None,
+                 max_disk_entries: int = 10000):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # None disables the perceptual tier; 0 only matches identical hashes. A 64-bit
+        # dHash cannot tell apart a single changed digit in a large frame, so the
+        # tier is opt-in for callers that resend re-encoded copies of the same image
+        self.phash_distance = phash_distance
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self.lock = threading.Lock()
+        self.entries: 'OrderedDict[str, Tuple[Dict[str, Any], int]]' = OrderedDict()
+        # options key -> {exact key: (phash, shape)}
+        self.phash_index: Dict[str, Dict[str, Tuple[int, Tuple[int, ...]]]] = {}
+        self.size_bytes = 0
+        self.disk_writes = 0
+        self.stats = {'hits': 0, 'perceptualHits': 0, 'diskHits': 0, 'misses': 0, 'evictions': 0}
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def make_key(self, image: np.ndarray, options: Dict[str, Any]) -> Tuple[str, str]:
+        """Return (exact key, options key) for a decoded image"""
+        options_key = normalize_options(options)
+        digest = hashlib.sha256()
+        digest.update(str(image.shape).encode('ascii'))
+        digest.update(np.ascontiguousarray(image).data)
+        digest.update(options_key.encode('utf-8'))
+        return digest.hexdigest(), options_key
+
+    def get(self, image: np.ndarray, options: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str, Dict[str, Any]]:
+        """Look up a result; returns (result or None, tier, lookup context for put())"""
+        key, options_key = self.make_key(image, options)
+        context = {'key': key, 'options_key': options_key, 'phash': None, 'shape': image.shape}
+
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return copy.deepcopy(self.entries[key][0]), 'exact', context
+
+        result = self.read_disk(key)
+        if result is not None:
+            with self.lock:
+                self.stats['diskHits'] += 1
+            self.store_memory(key, options_key, result, None, image.shape)
+            return copy.deepcopy(result), 'disk', context
+
+        if self.phash_distance is not None:
+            context['phash'] = perceptual_hash(image)
+            with self.lock:
+                for candidate_key, (candidate_hash, shape) in self.phash_index.get(options_key, {}).items():
+                    if shape == image.shape and bin(candidate_hash ^ context['phash']).count('1') <= self.phash_distance:
+                        self.entries.move_to_end(candidate_key)
+                        self.stats['perceptualHits'] += 1
+                        return copy.deepcopy(self.entries[candidate_key][0]), 'perceptual', context
+
+        with self.lock:
+            self.stats['misses'] += 1
+        return None, 'miss', context
+
+    def put(self, context: Dict[str, Any], result: Dict[str, Any]):
+        """Store a freshly computed result under the key from get()"""
+        result = copy.deepcopy(result)
+        self.store_memory(context['key'], context['options_key'], result, context['phash'], context['shape'])
+        self.write_disk(context['key'], result)
+
+    def store_memory(self, key: str, options_key: str, result: Dict[str, Any],
+                     phash: Optional[int], shape: Tuple[int, ...]):
+        size = len(json.dumps(result))
+        if size > self.max_bytes:
+            return
+
+        with self.lock:
+            if key in self.entries:
+                self.size_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (result, size)
+            self.size_bytes += size
+            if phash is not None:
+                self.phash_index.setdefault(options_key, {})[key] = (phash, shape)
+
+            while len(self.entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                evicted_key, (_, evicted_size) = self.entries.popitem(last=False)
+                self.size_bytes -= evicted_size
+                self.stats['evictions'] += 1
+                for index in self.phash_index.values():
+                    index.pop(evicted_key, None)
+
+    def disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self.disk_path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to read OCR cache entry {key}: {str(e)}")
+            return None
+
+    def write_disk(self, key: str, result: Dict[str, Any]):
+        if not self.disk_dir:
+            return
+        try:
+            path = self.disk_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+
+            with self.lock:
+                self.disk_writes += 1
+                prune = self.disk_writes % 100 == 0
+            if prune:
+                self.prune_disk()
+        except Exception as e:
+            logger.warning(f"Failed to write OCR cache entry {key}: {str(e)}")
+
+    def prune_disk(self):
+        """Drop the oldest on-disk entries beyond max_disk_entries"""
+        files: List[Tuple[float, str]] = []
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                if name.endswith('.json'):
+                    path = os.path.join(root, name)
+                    files.append((os.path.getmtime(path), path))
+        if len(files) <= self.max_disk_entries:
+            return
+        files.sort()
+        for _, path in files[:len(files) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = sum(self.stats[key] for key in ('hits', 'perceptualHits', 'diskHits', 'misses'))
+            hits = lookups - self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self.entries),
+                'bytes': self.size_bytes,
+                'hitRate': round(hits / lookups, 4) if lookups else 0.0,
+                'perceptual': self.phash_distance is not None,
+                'diskDir': self.disk_dir
+            }
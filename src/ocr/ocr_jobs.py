@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Asynchronous OCR job queue for the Python OCR Service
+Runs submitted jobs on a fixed pool of worker threads from a bounded priority
+queue, deduplicates identical submissions and keeps results for a TTL
+"""
+
+import time
+import uuid
+import queue
+import logging
+import threading
+from typing import Dict, Any, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no room; carries a retry hint in seconds"""
+
+    def __init__(self, retry_after: int):
+        super().__init__('OCR job queue is full')
+        self.retry_after = retry_after
+
+class OCRJob:
+    """A submitted OCR job and its outcome"""
+
+    def __init__(self, job_id: str, key: str, priority: int, run: Callable[[], Dict[str, Any]]):
+        self.id = job_id
+        self.key = key
+        self.priority = priority
+        self.run = run
+        self.status = 'queued'
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'jobId': self.id,
+            'status': self.status,
+            'priority': self.priority,
+            'queuedMs': int(((self.started_at or time.time()) - self.submitted_at) * 1000),
+            'runMs': int((self.finished_at - self.started_at) * 1000) if self.finished_at and self.started_at else None,
+            'result': self.result,
+            'error': self.error
+        }
+
+class OCRJobQueue:
+    """Bounded priority queue of OCR jobs served by a fixed worker pool
+
+    Higher `priority` runs first; equal priorities run in submission order.
+    Submitting a job whose key matches a queued, running or unexpired finished
+    job returns that job instead of queueing a duplicate.
+    """
+
+    def __init__(self, workers: int = 2, max_queued: int = 64, result_ttl: float = 600.0):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.queue: queue.PriorityQueue = queue.PriorityQueue()
+        self.lock = threading.Lock()
+        self.jobs: Dict[str, OCRJob] = {}
+        self.by_key: Dict[str, str] = {}
+        self.queued = 0
+        self.sequence = 0
+        self.closed = False
+        # Moving average of job run time, used for the retry hint
+        self.average_run_seconds = 1.0
+        self.stats = {'submitted': 0, 'deduplicated': 0, 'rejected': 0, 'completed': 0, 'failed': 0, 'cancelled': 0}
+
+        self.threads = [
+            threading.Thread(target=self.worker_loop, name=f'ocr-job-{index}', daemon=True)
+            for index in range(workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, key: str, run: Callable[[], Dict[str, Any]], priority: int = 0) -> Tuple[OCRJob, bool]:
+        """Queue a job; returns (job, deduplicated) or raises QueueFullError"""
+        with self.lock:
+            if self.closed:
+                raise RuntimeError('OCR job queue is closed')
+            self.expire()
+
+            existing = self.jobs.get(self.by_key.get(key, ''))
+            if existing is not None and existing.status in ('queued', 'running', 'done'):
+                self.stats['deduplicated'] += 1
+                return existing, True
+
+            if self.queued >= self.max_queued:
+                self.stats['rejected'] += 1
+                raise QueueFullError(self.retry_after())
+
+            job = OCRJob(uuid.uuid4().hex, key, priority, run)
+            self.jobs[job.id] = job
+            self.by_key[key] = job.id
+            self.queued += 1
+            self.sequence += 1
+            self.stats['submitted'] += 1
+            self.queue.put((-priority, self.sequence, job.id))
+            return job, False
+
+    def get(self, job_id: str) -> Optional[OCRJob]:
+        with self.lock:
+            self.expire()
+            return self.jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: float) -> Optional[OCRJob]:
+        """Long-poll: block until the job finishes or the timeout passes"""
+        job = self.get(job_id)
+        if job is not None and timeout > 0:
+            job.done.wait(timeout)
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that has not started yet"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.status != 'queued':
+                return False
+            job.status = 'cancelled'
+            job.finished_at = time.time()
+            self.queued -= 1
+            self.stats['cancelled'] += 1
+            if self.by_key.get(job.key) == job.id:
+                del self.by_key[job.key]
+        job.done.set()
+        return True
+
+    def worker_loop(self):
+        while True:
+            _, _, job_id = self.queue.get()
+            if job_id is None:
+                return
+
+            with self.lock:
+                job = self.jobs.get(job_id)
+                if job is None or job.status != 'queued':
+                    continue
+                job.status = 'running'
+                job.started_at = time.time()
+                self.queued -= 1
+
+            try:
+                result, error, status = job.run(), None, 'done'
+            except Exception as e:
+                logger.error(f"OCR job {job.id} failed: {str(e)}")
+                result, error, status = None, str(e), 'failed'
+
+            with self.lock:
+                job.result, job.error, job.status = result, error, status
+                job.finished_at = time.time()
+                # Release the submitted image as soon as the job has run
+                job.run = None
+                self.average_run_seconds = 0.8 * self.average_run_seconds + 0.2 * (job.finished_at - job.started_at)
+                self.stats['completed' if status == 'done' else 'failed'] += 1
+            job.done.set()
+
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is likely free (caller holds the lock)"""
+        return max(1, int(self.average_run_seconds * max(1, self.queued) / max(1, self.workers) + 0.5))
+
+    def expire(self):
+        """Drop finished jobs older than the result TTL (caller holds the lock)"""
+        cutoff = time.time() - self.result_ttl
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished_at and job.finished_at < cutoff]:
+            job = self.jobs.pop(job_id)
+            if self.by_key.get(job.key) == job_id:
+                del self.by_key[job.key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            running = sum(1 for job in self.jobs.values() if job.status == 'running')
+            return {
+                **self.stats,
+                'workers': self.workers,
+                'maxQueued': self.max_queued,
+                'queued': self.queued,
+                'running': running,
+                'retained': len(self.jobs),
+                'averageRunMs': int(self.average_run_seconds * 1000)
+            }
+
+    def close(self):
+        """Stop the workers after their current job; queued jobs are cancelled"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            for job in self.jobs.values():
+                if job.status == 'queued':
+                    job.status = 'cancelled'
+                    job.done.set()
+            self.queued = 0
+        for index in range(len(self.threads)):
+            # Sentinels sort after every real job
+            self.queue.put((float('inf'), index, None))
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Expected-value matching for the Python OCR Service
+Normalizes OCR output per field type and fuzzy-matches it against the values
+the caller expects, so only the best span per value leaves the service
+"""
+
+import re
+import unicodedata
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Any, Optional
+
+# Field types compared on their digits only
+DIGIT_FIELD_TYPES = ('phone', 'cpf', 'cnpj', 'cep', 'date')
+
+# Field types compared as parsed numbers
+NUMERIC_FIELD_TYPES = ('number', 'currency', 'percentage')
+
+# Extra words a candidate span may have beyond the expected token count
+SPAN_SLACK = 2
+
+def parse_number(value: str) -> Optional[Decimal]:
+    """Parse a number written with Brazilian or US separators (R$ 1.234,56 / 1,234.56)"""
+    cleaned = re.sub(r'[^0-9,.\-]', '', value)
+    if not re.search(r'\d', cleaned):
+        return None
+
+    if ',' in cleaned and '.' in cleaned:
+        decimal_sep = ',' if cleaned.rfind(',') > cleaned.rfind('.') else '.'
+    elif ',' in cleaned:
+        decimal_sep = ',' if re.search(r',\d{1,2}$', cleaned) else None
+    elif cleaned.count('.') == 1 and not re.search(r'\.\d{3}$', cleaned):
+        decimal_sep = '.'
+    else:
+        decimal_sep = None
+
+    thousands_sep = {',': '.', '.': ','}.get(decimal_sep, None)
+    if thousands_sep:
+        cleaned = cleaned.replace(thousands_sep, '')
+    if decimal_sep is None:
+        cleaned = cleaned.replace(',', '').replace('.', '')
+    else:
+        cleaned = cleaned.replace(decimal_sep, '.')
+
+    try:
+        return Decimal(cleaned)
+    except InvalidOperation:
+        return None
+
+def normalize_value(value: Any, field_type: str = 'text') -> str:
+    """Canonical form of a value for comparison under its field type"""
+    text = str(value).strip()
+
+    if field_type in DIGIT_FIELD_TYPES:
+        return re.sub(r'\D', '', text)
+
+    if field_type in NUMERIC_FIELD_TYPES:
+        number = parse_number(text)
+        if number is None:
+            return re.sub(r'\D', '', text)
+        if field_type == 'currency':
+            return f"{number:.2f}"
+        return format(number.normalize(), 'f')
+
+    if field_type == 'email':
+        return re.sub(r'\s+', '', text).lower()
+
+    # Free text: fold case and accents, collapse whitespace
+    folded = unicodedata.normalize('NFKD', text.casefold())
+    folded = ''.join(char for char in folded if not unicodedata.combining(char))
+    return re.sub(r'\s+', ' ', folded).strip()
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two strings"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j - 1] + (char_a != char_b), previous[j] + 1, current[j - 1] + 1))
+        previous = current
+    return previous[-1]
+
+def similarity(a: str, b: str) -> float:
+    """Levenshtein similarity in [0, 1] (same measure as the TypeScript OCREngine)"""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    return (max(len(a), len(b)) - edit_distance(a, b)) / max(len(a), len(b))
+
+def find_best_match(expected: str, field_type: str, words: Dict[str, List[Any]]) -> Optional[Dict[str, Any]]:
+    """Best contiguous span of words on one line for an expected value
+
+    `words` is the columnar OCR word form (text, conf, x0, y0, x1, y1,
+    line_id). Returns the span text, similarity, mean word confidence and
+    bbox in the OCR result's coordinates, or None when there are no words.
+    """
+    target = normalize_value(expected, field_type)
+    span_words = max(1, len(str(expected).split()))
+
+    lines: Dict[int, List[int]] = {}
+    for index, line_id in enumerate(words['line_id']):
+        lines.setdefault(line_id, []).append(index)
+
+    # Shorter spans first, so a label next to the value never wins a tie
+    best = None
+    for length in range(1, span_words + SPAN_SLACK + 1):
+        for indices in lines.values():
+            for start in range(len(indices) - length + 1):
+                span = indices[start:start + length]
+                span_text = ' '.join(str(words['text'][i]) for i in span)
+                score = similarity(normalize_value(span_text, field_type), target)
+                if best is None or score > best['similarity']:
+                    best = {
+                        'match': span_text,
+                        'similarity': score,
+                        'confidence': sum(words['conf'][i] for i in span) / len(span),
+                        'bbox': {
+                            'x0': min(words['x0'][i] for i in span),
+                            'y0': min(words['y0'][i] for i in span),
+                            'x1': max(words['x1'][i] for i in span),
+                            'y1': max(words['y1'][i] for i in span)
+                        }
+                    }
+                    if score == 1.0:
+                        return best
+    return best
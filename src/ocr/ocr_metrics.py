@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Stage-level metrics for the Python OCR Service
+Fixed-bucket latency histograms per pipeline stage, broken down by language
+and psm, plus image size distributions and per-endpoint in-flight counts
+"""
+
+import bisect
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+# Latency bucket upper bounds (ms); the last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Image size bucket upper bounds
+MEGAPIXEL_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32)
+KILOBYTE_BUCKETS = (16, 64, 256, 1024, 4096, 16384)
+
+# Timing keys produced by the preprocessing stage plan
+PREPROCESS_STAGES = ('crop', 'grayscale', 'scale', 'denoise', 'enhance_contrast', 'threshold', 'analyze')
+
+class Histogram:
+    """Fixed-bucket (non-cumulative) histogram with count, sum, min and max"""
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (max for the open bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': round(self.total, 2),
+            'mean': round(self.total / self.count, 2) if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            # counts[i] falls at or below bounds[i]; the extra last count is above every bound
+            'bounds': list(self.bounds),
+            'counts': list(self.counts)
+        }
+
+class OCRMetrics:
+    """Thread-safe registry of OCR stage latencies, image sizes and request counts"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # stage -> "language/psmN" -> histogram
+        self.stages: Dict[str, Dict[str, Histogram]] = {}
+        self.megapixels = Histogram(MEGAPIXEL_BUCKETS)
+        self.kilobytes = Histogram(KILOBYTE_BUCKETS)
+        self.cache_tiers: Dict[str, int] = {}
+        # endpoint -> counters and latency
+        self.endpoints: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def stage_name(key: str) -> str:
+        return f"preprocess.{key}" if key in PREPROCESS_STAGES else key
+
+    def observe_stage(self, stage: str, elapsed_ms: float, language: str = 'all', psm: Any = 'all'):
+        label = f"{language}/psm{psm}"
+        with self.lock:
+            histogram = self.stages.setdefault(stage, {}).get(label)
+            if histogram is None:
+                histogram = self.stages[stage][label] = Histogram(LATENCY_BUCKETS_MS)
+            histogram.observe(elapsed_ms)
+
+    def observe_result(self, result: Dict[str, Any], options: Dict[str, Any], encoded_bytes: Optional[int] = None):
+        """Record the stage timings, image size and cache tier of one OCR result"""
+        language = options.get('language', 'eng')
+        psm = options.get('psm', 6)
+        for key, elapsed_ms in (result.get('stageTimings') or {}).items():
+            self.observe_stage(self.stage_name(key), float(elapsed_ms), language, psm)
+
+        decode = result.get('decode') or {}
+        width = decode.get('sourceWidth') or decode.get('width')
+        height = decode.get('sourceHeight') or decode.get('height')
+        with self.lock:
+            if width and height:
+                self.megapixels.observe(width * height / 1_000_000)
+            if encoded_bytes:
+                self.kilobytes.observe(encoded_bytes / 1024)
+            tier = (result.get('cache') or {}).get('tier', 'off')
+            self.cache_tiers[tier] = self.cache_tiers.get(tier, 0) + 1
+
+    def request_started(self, endpoint: str):
+        with self.lock:
+            entry = self.endpoints.setdefault(endpoint, {
+                'inFlight': 0, 'requests': 0, 'errors': 0, 'latency': Histogram(LATENCY_BUCKETS_MS)
+            })
+            entry['inFlight'] += 1
+
+    def request_finished(self, endpoint: str, status: int, elapsed_ms: float):
+        with self.lock:
+            entry = self.endpoints.get(endpoint)
+            if entry is None:
+                return
+            entry['inFlight'] -= 1
+            entry['requests'] += 1
+            if status >= 400:
+                entry['errors'] += 1
+            entry['latency'].observe(elapsed_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'stages': {
+                    stage: {label: histogram.to_dict() for label, histogram in sorted(labels.items())}
+                    for stage, labels in sorted(self.stages.items())
+                },
+                'imageSizes': {
+                    'megapixels': self.megapixels.to_dict(),
+                    'kilobytes': self.kilobytes.to_dict()
+                },
+                'cacheTiers': dict(self.cache_tiers),
+                'endpoints': {
+                    endpoint: {
+                        'inFlight': entry['inFlight'],
+                        'requests': entry['requests'],
+                        'errors': entry['errors'],
+                        'latencyMs': entry['latency'].to_dict()
+                    }
+                    for endpoint, entry in sorted(self.endpoints.items())
+                },
+                'inFlight': sum(entry['inFlight'] for entry in self.endpoints.values())
+            }
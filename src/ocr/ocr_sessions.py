@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Session store for incremental OCR in the Python OCR Service
+Remembers the per-band recognition results of the last capture of a page so
+a new capture only re-OCRs the bands whose pixels changed
+"""
+
+import copy
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Tuple
+
+# (band top, band bottom, pixel digest)
+BandKey = Tuple[int, int, str]
+
+class OCRSessionStore:
+    """LRU, TTL-bounded map of session key -> recognized bands of the last capture"""
+
+    def __init__(self, max_sessions: int = 64, ttl_seconds: float = 1800.0):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.Lock()
+        # session key -> (options key, width, last use, {band key: recognition data})
+        self.sessions: 'OrderedDict[str, Tuple[str, int, float, Dict[BandKey, Dict[str, List[Any]]]]]' = OrderedDict()
+        self.stats = {'captures': 0, 'bandsReused': 0, 'bandsRecognized': 0, 'expired': 0}
+
+    def get_bands(self, session: str, options_key: str, width: int) -> Dict[BandKey, Dict[str, List[Any]]]:
+        """Bands recognized for the session's last capture, if it used the same options and width"""
+        with self.lock:
+            self.expire()
+            entry = self.sessions.get(session)
+            if entry is None or entry[0] != options_key or entry[1] != width:
+                return {}
+            self.sessions.move_to_end(session)
+            return entry[3]
+
+    def put_bands(self, session: str, options_key: str, width: int,
+                  bands: Dict[BandKey, Dict[str, List[Any]]], reused: int, recognized: int):
+        """Replace the session's state with the bands of the latest capture"""
+        with self.lock:
+            self.sessions[session] = (options_key, width, time.time(), copy.deepcopy(bands))
+            self.sessions.move_to_end(session)
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+            self.stats['captures'] += 1
+            self.stats['bandsReused'] += reused
+            self.stats['bandsRecognized'] += recognized
+
+    def drop(self, session: str) -> bool:
+        with self.lock:
+            return self.sessions.pop(session, None) is not None
+
+    def expire(self):
+        """Drop sessions idle longer than the TTL (caller holds the lock)"""
+        cutoff = time.time() - self.ttl_seconds
+        for key in [key for key, entry in self.sessions.items() if entry[2] < cutoff]:
+            del self.sessions[key]
+            self.stats['expired'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {**self.stats, 'sessions': len(self.sessions)}
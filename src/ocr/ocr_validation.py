@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Validation client for the Python OCR Service
+Hands OCR text straight to the LLM server's /validate over persistent local
+connections, so a fused OCR-and-validate request needs no client round trip
+"""
+
+import json
+import time
+import threading
+import http.client
+from urllib.parse import urlsplit
+from typing import Dict, Any
+
+# Local LLM server (llm-server-production.py) and its per-request timeout
+DEFAULT_LLM_URL = 'http://localhost:8000'
+DEFAULT_VALIDATION_TIMEOUT = 30.0
+
+class ValidationClient:
+    """Calls /validate on the LLM server with one keep-alive connection per thread"""
+
+    def __init__(self, base_url: str = DEFAULT_LLM_URL, timeout: float = DEFAULT_VALIDATION_TIMEOUT):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or 'localhost'
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.secure = parts.scheme == 'https'
+        self.path = parts.path.rstrip('/') + '/validate'
+        self.timeout = timeout
+        self.local = threading.local()
+        self.stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'cacheHits': 0, 'reconnects': 0, 'totalMs': 0.0}
+
+    def connection(self, fresh: bool = False) -> http.client.HTTPConnection:
+        connection = getattr(self.local, 'connection', None)
+        if connection is None or fresh:
+            if connection is not None:
+                connection.close()
+                with self.stats_lock:
+                    self.stats['reconnects'] += 1
+            connection_class = http.client.HTTPSConnection if self.secure else http.client.HTTPConnection
+            connection = self.local.connection = connection_class(self.host, self.port, timeout=self.timeout)
+        return connection
+
+    def post(self, body: bytes) -> Dict[str, Any]:
+        headers = {'Content-Type': 'application/json', 'Connection': 'keep-alive'}
+        # A kept-alive connection may have been closed by the server; retry once on a new one
+        for attempt in range(2):
+            connection = self.connection(fresh=attempt > 0)
+            try:
+                connection.request('POST', self.path, body=body, headers=headers)
+                response = connection.getresponse()
+                payload = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                if attempt:
+                    raise
+        if response.will_close:
+            connection.close()
+
+        data = json.loads(payload.decode('utf-8')) if payload else {}
+        if response.status >= 400 and not data.get('error'):
+            data['error'] = f'LLM server returned HTTP {response.status}'
+        return data
+
+    def validate(self, csv_value: str, web_value: str, field_type: str = 'text',
+                 field_name: str = 'unknown') -> Dict[str, Any]:
+        """Validation result from the LLM server; errors come back in `error`"""
+        start = time.perf_counter()
+        body = json.dumps({
+            'csv_value': csv_value,
+            'web_value': web_value,
+            'field_type': field_type,
+            'field_name': field_name
+        }).encode('utf-8')
+
+        try:
+            result = self.post(body)
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            result = {'error': f'LLM server unavailable: {str(e)}', 'match': False, 'confidence': 0.0}
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self.stats_lock:
+            self.stats['requests'] += 1
+            self.stats['totalMs'] += elapsed_ms
+            if result.get('error'):
+                self.stats['errors'] += 1
+            if result.get('from_cache'):
+                self.stats['cacheHits'] += 1
+        result['elapsed_ms'] = elapsed_ms
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.stats_lock:
+            requests = self.stats['requests']
+            return {
+                'url': f"{'https' if self.secure else 'http'}://{self.host}:{self.port}",
+                'requests': requests,
+                'errors': self.stats['errors'],
+                'cacheHits': self.stats['cacheHits'],
+                'reconnects': self.stats['reconnects'],
+                'averageMs': round(self.stats['totalMs'] / requests, 2) if requests else None
+            }
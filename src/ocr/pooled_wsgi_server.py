@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Bounded worker-pool WSGI server for the Python OCR Service production mode
+Serves requests on a fixed pool of threads with a bounded accept queue and
+drains in-flight requests on shutdown
+"""
+
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any
+
+from werkzeug.serving import BaseWSGIServer
+
+logger = logging.getLogger(__name__)
+
+class PooledWSGIServer(BaseWSGIServer):
+    """WSGI server that hands accepted connections to a fixed thread pool
+
+    At most `workers` requests run at once and at most `queue_size` more wait
+    for a free worker; connections beyond that get an immediate 503 with a
+    Retry-After hint instead of piling up.
+    """
+
+    multithread = True
+
+    def __init__(self, host: str, port: int, app, workers: int, queue_size: int, **kwargs):
+        self.workers = workers
+        self.queue_size = queue_size
+        # Listen backlog for connections not yet accepted
+        self.request_queue_size = queue_size
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ocr-worker')
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.inflight = 0
+        self.inflight_condition = threading.Condition()
+        self.rejected = 0
+        super().__init__(host, port, app, **kwargs)
+
+    def process_request(self, request, client_address):
+        """Queue the connection for a worker, or reject it when the queue is full"""
+        if not self.slots.acquire(blocking=False):
+            self.rejected += 1
+            self.reject_request(request)
+            return
+
+        with self.inflight_condition:
+            self.inflight += 1
+        self.executor.submit(self.process_request_worker, request, client_address)
+
+    def process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.slots.release()
+            with self.inflight_condition:
+                self.inflight -= 1
+                self.inflight_condition.notify_all()
+
+    def reject_request(self, request):
+        body = json.dumps({'error': 'OCR service is at capacity', 'retryAfter': 1}).encode('utf-8')
+        response = (
+            b'HTTP/1.1 503 Service Unavailable\r\n'
+            b'Content-Type: application/json\r\n'
+            b'Retry-After: 1\r\n'
+            b'Connection: close\r\n'
+            + f'Content-Length: {len(body)}\r\n\r\n'.encode('ascii')
+            + body
+        )
+        try:
+            request.sendall(response)
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+
+    def drain(self, timeout: float) -> bool:
+        """Wait for queued and running requests to finish; True if fully drained"""
+        with self.inflight_condition:
+            drained = self.inflight_condition.wait_for(lambda: self.inflight == 0, timeout)
+            remaining = self.inflight
+        self.executor.shutdown(wait=drained)
+        if not drained:
+            logger.warning(f"Drain timed out with {remaining} request(s) still in flight")
+        return drained
+
+    def stats(self) -> Dict[str, Any]:
+        with self.inflight_condition:
+            inflight = self.inflight
+        return {
+            'workers': self.workers,
+            'queueSize': self.queue_size,
+            'inFlight': inflight,
+            'queued': max(0, inflight - self.workers),
+            'rejected': self.rejected
+        }
@@ -5,9 +5,18 @@ export interface PythonOCRClientOptions {
   pythonServiceUrl?: string;
   timeout?: number;
   retryAttempts?: number;
+  /**
+   * 'binary' posts raw image bytes to /extract/raw (no base64 inflation);
+   * 'json' keeps the legacy base64 JSON body on /extract
+   */
+  transport?: 'binary' | 'json';
 }
 
 export interface ImagePreprocessingOptions {
+  /** Let the service pick transforms from image statistics (overrides the flags below) */
+  auto?: boolean;
+  /** Latency profile for auto mode */
+  profile?: 'fast' | 'accurate';
   denoise?: boolean;
   enhanceContrast?: boolean;
   threshold?: boolean;
@@ -20,6 +29,71 @@ export interface ImagePreprocessingOptions {
   };
 }
 
+export interface OCRRegionRequest {
+  name: string;
+  x: number;
+  y: number;
+  width: number;
+  height: number;
+  options?: {
+    language?: string;
+    psm?: number;
+    oem?: number;
+    whitelist?: string;
+    blacklist?: string;
+  };
+}
+
+export interface OCRExpectedValue {
+  id?: string;
+  value: string;
+  fieldType?: string;
+  /** Restrict the search to the named region */
+  region?: string;
+}
+
+export interface OCRExpectedValueMatch {
+  id: string;
+  value: string;
+  fieldType: string;
+  normalized: string;
+  found: boolean;
+  match: string | null;
+  similarity: number;
+  confidence: number | null;
+  bbox: { x0: number; y0: number; x1: number; y1: number } | null;
+  region: string | null;
+}
+
+export interface OCRFieldValidationRequest {
+  id?: string;
+  fieldName?: string;
+  fieldType?: string;
+  csvValue: string;
+  /** Region holding the field; the whole image when omitted */
+  region?: Omit<OCRRegionRequest, 'name'>;
+  /** Validate only the span that best matches the CSV value */
+  locate?: boolean;
+}
+
+export interface OCRFieldValidation {
+  id: string;
+  fieldName: string;
+  fieldType: string;
+  csvValue: string;
+  webValue?: string;
+  ocrConfidence?: number;
+  region?: { left: number; top: number; width: number; height: number };
+  match: boolean;
+  confidence: number;
+  reasoning?: string | null;
+  modelUsed?: string | null;
+  fromCache?: boolean;
+  ocrMs?: number;
+  validateMs?: number;
+  error?: string | null;
+}
+
 export interface OCRSearchOptions {
   searchText: string;
   fuzzyMatch?: boolean;
@@ -36,6 +110,7 @@ export class PythonOCRClient {
   private pythonServiceUrl: string;
   private timeout: number;
   private retryAttempts: number;
+  private transport: 'binary' | 'json';
   private initialized: boolean = false;
   private processingStats: {
     totalImages: number;
@@ -54,6 +129,7 @@ export class PythonOCRClient {
     this.pythonServiceUrl = options.pythonServiceUrl || 'http://localhost:5000';
     this.timeout = options.timeout || 30000; // 30 seconds
     this.retryAttempts = options.retryAttempts || 3;
+    this.transport = options.transport || 'binary';
   }
 
   /**
@@ -139,22 +215,12 @@ export class PythonOCRClient {
         throw new Error('Image buffer is too small to contain valid image data');
       }
 
-      // Detect image format and convert buffer to base64
-      const imageFormat = this.detectImageFormat(imageBuffer);
-      const base64Image = imageBuffer.toString('base64');
-
-      // Prepare request
-      const requestBody = {
-        image: `data:image/${imageFormat};base64,${base64Image}`,
-        options: {
-          language: 'eng+por',
-          psm: 6,
-          oem: 3
-        }
-      };
-
       // Make request to Python OCR service
-      const response = await this.makeRequest('/extract', requestBody);
+      const response = await this.requestExtraction(imageBuffer, {
+        language: 'eng+por',
+        psm: 6,
+        oem: 3
+      });
 
       const processingTime = Date.now() - startTime;
 
@@ -184,7 +250,7 @@ export class PythonOCRClient {
         })),
         processingTime,
         boundingBox: response.boundingBox,
-        preprocessing: [],
+        preprocessing: response.preprocessing || [],
         language: response.language
       };
 
@@ -273,28 +339,20 @@ export class PythonOCRClient {
         preprocessingOptions
       });
 
-      // Detect image format and convert buffer to base64
-      const imageFormat = this.detectImageFormat(imageBuffer);
-      const base64Image = imageBuffer.toString('base64');
-
-      // Prepare request with preprocessing options
-      const requestBody = {
-        image: `data:image/${imageFormat};base64,${base64Image}`,
-        options: {
-          language: 'eng+por',
-          psm: 6,
-          oem: 3,
-          grayscale: true,
-          denoise: preprocessingOptions.denoise || false,
-          enhanceContrast: preprocessingOptions.enhanceContrast || false,
-          threshold: preprocessingOptions.threshold !== undefined,
-          scale: preprocessingOptions.scale || 1,
-          crop_region: preprocessingOptions.cropRegion
-        }
-      };
-
-      // Make request to Python OCR service
-      const response = await this.makeRequest('/extract', requestBody);
+      // Make request to Python OCR service with preprocessing options
+      const response = await this.requestExtraction(imageBuffer, {
+        language: 'eng+por',
+        psm: 6,
+        oem: 3,
+        grayscale: true,
+        denoise: preprocessingOptions.denoise || false,
+        enhance_contrast: preprocessingOptions.enhanceContrast || false,
+        threshold: preprocessingOptions.threshold !== undefined,
+        scale: preprocessingOptions.scale || 1,
+        auto: preprocessingOptions.auto || false,
+        profile: preprocessingOptions.profile || 'fast',
+        crop_region: preprocessingOptions.cropRegion
+      });
 
       const processingTime = Date.now() - startTime;
 
@@ -324,7 +382,7 @@ export class PythonOCRClient {
         })),
         processingTime,
         boundingBox: response.boundingBox,
-        preprocessing: [],
+        preprocessing: response.preprocessing || [],
         language: response.language
       };
 
@@ -457,6 +515,200 @@ export class PythonOCRClient {
     return this.extractTextWithPreprocessing(imageBuffer, regionOptions);
   }
 
+  /**
+   * Extract text from several named regions of one screenshot in a single request
+   */
+  async extractTextFromRegions(
+    imageBuffer: Buffer,
+    regions: OCRRegionRequest[],
+    preprocessingOptions: ImagePreprocessingOptions = {}
+  ): Promise<Record<string, OCRResult>> {
+    if (!this.initialized) {
+      throw new Error('Python OCR Client not initialized. Call initialize() first.');
+    }
+
+    const startTime = Date.now();
+
+    const form = new FormData();
+    form.append('image', new Blob([imageBuffer]), `screenshot.${this.detectImageFormat(imageBuffer)}`);
+    form.append('options', JSON.stringify({
+      language: 'eng+por',
+      psm: 6,
+      oem: 3,
+      denoise: preprocessingOptions.denoise || false,
+      enhance_contrast: preprocessingOptions.enhanceContrast || false,
+      threshold: preprocessingOptions.threshold !== undefined,
+      scale: preprocessingOptions.scale || 1
+    }));
+    form.append('regions', JSON.stringify(regions.map(region => ({
+      name: region.name,
+      left: region.x,
+      top: region.y,
+      width: region.width,
+      height: region.height,
+      options: region.options
+    }))));
+
+    const response = await this.makeRequest('/extract/regions', form, {});
+    const processingTime = Date.now() - startTime;
+
+    const results: Record<string, OCRResult> = {};
+    for (const [name, regionResult] of Object.entries<any>(response.regions || {})) {
+      if (regionResult.error) {
+        this.logger.warn(`Region OCR failed for ${name}`, { error: regionResult.error });
+        results[name] = this.getEmptyResult();
+        continue;
+      }
+
+      results[name] = {
+        text: regionResult.text,
+        confidence: regionResult.confidence,
+        words: regionResult.words,
+        lines: regionResult.lines,
+        processingTime: regionResult.processingTime,
+        boundingBox: regionResult.boundingBox,
+        preprocessing: regionResult.preprocessing || [],
+        language: regionResult.language
+      };
+    }
+
+    this.logger.info('Region OCR extraction completed', {
+      regionCount: regions.length,
+      processingTime
+    });
+
+    return results;
+  }
+
+  /**
+   * Find expected values in an image on the service, receiving only the best match per value
+   */
+  async matchExpectedValues(
+    imageBuffer: Buffer,
+    expected: OCRExpectedValue[],
+    regions: OCRRegionRequest[] = [],
+    options: { minSimilarity?: number; stopSimilarity?: number } = {}
+  ): Promise<OCRExpectedValueMatch[]> {
+    if (!this.initialized) {
+      throw new Error('Python OCR Client not initialized. Call initialize() first.');
+    }
+
+    const form = new FormData();
+    form.append('image', new Blob([imageBuffer]), `screenshot.${this.detectImageFormat(imageBuffer)}`);
+    form.append('options', JSON.stringify({ language: 'eng+por', psm: 6, oem: 3 }));
+    form.append('expected', JSON.stringify(expected.map(item => ({
+      id: item.id,
+      value: item.value,
+      field_type: item.fieldType || 'text',
+      region: item.region
+    }))));
+    form.append('regions', JSON.stringify(regions.map(region => ({
+      name: region.name,
+      left: region.x,
+      top: region.y,
+      width: region.width,
+      height: region.height,
+      options: region.options
+    }))));
+    if (options.minSimilarity !== undefined) {
+      form.append('min_similarity', JSON.stringify(options.minSimilarity));
+    }
+    if (options.stopSimilarity !== undefined) {
+      form.append('stop_similarity', JSON.stringify(options.stopSimilarity));
+    }
+
+    const response = await this.makeRequest('/extract/match', form, {});
+
+    this.logger.info('Expected-value matching completed', {
+      valueCount: expected.length,
+      found: (response.matches || []).filter((match: OCRExpectedValueMatch) => match.found).length,
+      earlyStop: response.earlyStop
+    });
+
+    return response.matches || [];
+  }
+
+  /**
+   * OCR field regions and validate them against their CSV values in one request;
+   * the OCR service forwards each field's text to the LLM server itself
+   */
+  async validateFields(imageBuffer: Buffer, fields: OCRFieldValidationRequest[]): Promise<OCRFieldValidation[]> {
+    if (!this.initialized) {
+      throw new Error('Python OCR Client not initialized. Call initialize() first.');
+    }
+
+    const form = new FormData();
+    form.append('image', new Blob([imageBuffer]), `screenshot.${this.detectImageFormat(imageBuffer)}`);
+    form.append('options', JSON.stringify({ language: 'eng+por', psm: 6, oem: 3 }));
+    form.append('fields', JSON.stringify(fields.map(field => ({
+      id: field.id,
+      field_name: field.fieldName,
+      field_type: field.fieldType || 'text',
+      csv_value: field.csvValue,
+      locate: field.locate,
+      region: field.region && {
+        left: field.region.x,
+        top: field.region.y,
+        width: field.region.width,
+        height: field.region.height,
+        options: field.region.options
+      }
+    }))));
+
+    const response = await this.makeRequest('/pipeline/validate', form, {});
+
+    this.logger.info('Field validation pipeline completed', {
+      fieldCount: fields.length,
+      matched: response.matched,
+      failed: response.failed,
+      processingTime: response.processingTime
+    });
+
+    return response.fields || [];
+  }
+
+  /**
+   * Run a long OCR job through the service's job queue: submit, then long-poll
+   * for the result so no single HTTP request outlives the client timeout
+   */
+  async extractTextAsJob(
+    imageBuffer: Buffer,
+    options: Record<string, unknown> = {},
+    priority: number = 0,
+    maxWaitMs: number = 5 * 60 * 1000
+  ): Promise<any> {
+    if (!this.initialized) {
+      throw new Error('Python OCR Client not initialized. Call initialize() first.');
+    }
+
+    const form = new FormData();
+    form.append('image', new Blob([imageBuffer]), `screenshot.${this.detectImageFormat(imageBuffer)}`);
+    form.append('options', JSON.stringify({ language: 'eng+por', psm: 6, oem: 3, ...options }));
+    form.append('priority', JSON.stringify(priority));
+
+    const job = await this.makeRequest('/jobs', form, {});
+    const deadline = Date.now() + maxWaitMs;
+    // Keep each long-poll well inside the request timeout
+    const pollSeconds = Math.max(1, Math.min(25, Math.floor(this.timeout / 2000)));
+
+    while (Date.now() < deadline) {
+      const response = await fetch(`${this.pythonServiceUrl}/jobs/${job.jobId}?wait=${pollSeconds}`);
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+      }
+
+      const status = await response.json();
+      if (status.status === 'done') {
+        return status.result;
+      }
+      if (status.status === 'failed' || status.status === 'cancelled') {
+        throw new Error(`OCR job ${job.jobId} ${status.status}: ${status.error || 'no result'}`);
+      }
+    }
+
+    throw new Error(`OCR job ${job.jobId} did not finish within ${maxWaitMs}ms`);
+  }
+
   /**
    * Batch process multiple images
    */
@@ -486,10 +738,38 @@ export class PythonOCRClient {
     return results;
   }
 
+  /**
+   * Send an image to the extraction endpoint using the configured transport
+   */
+  private async requestExtraction(imageBuffer: Buffer, options: Record<string, unknown>): Promise<any> {
+    if (this.transport === 'json') {
+      const imageFormat = this.detectImageFormat(imageBuffer);
+      return this.makeRequest('/extract', {
+        image: `data:image/${imageFormat};base64,${imageBuffer.toString('base64')}`,
+        options
+      });
+    }
+
+    const response = await this.makeRequest('/extract/raw', imageBuffer, {
+      'Content-Type': 'application/octet-stream',
+      'X-OCR-Options': JSON.stringify(options)
+    });
+
+    if (response.transfer) {
+      this.logger.debug('Binary OCR upload', response.transfer);
+    }
+
+    return response;
+  }
+
   /**
    * Make HTTP request to Python OCR service with retry logic
    */
-  private async makeRequest(endpoint: string, body: any): Promise<any> {
+  private async makeRequest(
+    endpoint: string,
+    body: any,
+    headers: Record<string, string> = { 'Content-Type': 'application/json' }
+  ): Promise<any> {
     let lastError: Error | null = null;
 
     for (let attempt = 1; attempt <= this.retryAttempts; attempt++) {
@@ -499,10 +779,8 @@ export class PythonOCRClient {
 
         const response = await fetch(`${this.pythonServiceUrl}${endpoint}`, {
           method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-          body: JSON.stringify(body),
+          headers,
+          body: Buffer.isBuffer(body) || body instanceof FormData ? body : JSON.stringify(body),
           signal: controller.signal
         });
 
@@ -11,7 +11,9 @@ import logging
 import tempfile
 import base64
 import time
-from typing import Dict, List, Any, Optional, Tuple
+import hashlib
+import warnings
+from typing import Dict, List, Any, Optional, Tuple, Union
 from io import BytesIO
 from pathlib import Path
 
@@ -19,9 +21,21 @@ import cv2
 import numpy as np
 from PIL import Image
 import pytesseract
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from werkzeug.serving import make_server
 import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from tesseract_pool import TesseractEnginePool
+from pooled_wsgi_server import PooledWSGIServer
+from ocr_cache import OCRResultCache, normalize_options
+from ocr_sessions import OCRSessionStore
+from ocr_matching import find_best_match, normalize_value
+from ocr_jobs import OCRJobQueue, QueueFullError
+from ocr_metrics import OCRMetrics
+from ocr_validation import ValidationClient, DEFAULT_LLM_URL, DEFAULT_VALIDATION_TIMEOUT
 
 # Configure logging
 logging.basicConfig(
@@ -30,15 +44,183 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Starting estimate for base64 decode + JSON parse cost before any JSON request is observed
+DEFAULT_BASE64_DECODE_MS_PER_MB = 4.0
+
+# Options sent as individual headers, e.g. `X-OCR-Language: por`
+OPTION_HEADER_PREFIX = 'X-OCR-'
+
+# Header/form option values that are converted to the JSON API's types; any
+# other key (language, whitelist, blacklist, session, ...) stays a string
+NUMERIC_OPTION_FIELDS = ('psm', 'oem', 'scale', 'denoise_strength', 'tile_height', 'tile_overlap',
+                         'concurrency', 'timeout', 'priority')
+BOOLEAN_OPTION_FIELDS = ('auto', 'cache', 'denoise', 'detect_text', 'enhance_contrast', 'grayscale', 'threshold',
+                         'tiling', 'word_detail', 'reduced_decode', 'stage_timings', 'stream', 'ordered')
+JSON_OPTION_FIELDS = ('crop_region',)
+
+# Auto preprocessing: acceptable (low, high) median text height in px before
+# rescaling, and the height rescaled images are brought to
+AUTO_TEXT_HEIGHT_RANGE = {'fast': (18, 40), 'accurate': (24, 34)}
+AUTO_TARGET_TEXT_HEIGHT = 28
+AUTO_SCALE_LIMITS = (0.25, 4.0)
+
+# Text detection: blocks covering more than this share of the frame are
+# recognized as one image, since detection would not save any work
+DETECTION_MAX_COVERAGE = 0.7
+DETECTION_BLOCK_PADDING = 4
+
+# Each block is one recognition call (two subprocesses on the pytesseract
+# fallback), so pages with more blocks than this are recognized whole
+DETECTION_MAX_BLOCKS = 16
+DETECTION_MAX_BLOCKS_SUBPROCESS = 2
+
+# Tiling: band height and overlap in px of the preprocessed image. The
+# overlap must exceed the tallest text line so every line is whole in a band
+DEFAULT_TILE_HEIGHT = 1200
+DEFAULT_TILE_OVERLAP = 100
+
+# Smallest band accepted from a request; thinner bands multiply recognition calls
+MIN_TILE_HEIGHT = 200
+
+# Incremental sessions use shorter bands so a changed field re-OCRs little of the page
+INCREMENTAL_TILE_HEIGHT = 256
+INCREMENTAL_TILE_OVERLAP = 64
+
+# Reduced decode modes by downscale factor: (grayscale, color)
+REDUCED_DECODE_FLAGS = {
+    2: (cv2.IMREAD_REDUCED_GRAYSCALE_2, cv2.IMREAD_REDUCED_COLOR_2),
+    4: (cv2.IMREAD_REDUCED_GRAYSCALE_4, cv2.IMREAD_REDUCED_COLOR_4),
+    8: (cv2.IMREAD_REDUCED_GRAYSCALE_8, cv2.IMREAD_REDUCED_COLOR_8)
+}
+
+# Per-request decode budget: encoded bytes and decoded pixels
+DEFAULT_MAX_IMAGE_BYTES = 32 * 1024 * 1024
+DEFAULT_MAX_IMAGE_PIXELS = 40_000_000
+
+# Per-region options accepted by /extract/regions (decode mode is shared by all regions)
+REGION_OPTION_FIELDS = ('language', 'psm', 'oem', 'whitelist', 'blacklist', 'scale',
+                        'denoise', 'enhance_contrast', 'threshold', 'auto', 'profile', 'detect_text',
+                        'tiling', 'tile_height', 'tile_overlap', 'format', 'word_detail', 'engine', 'cache')
+
+# Expected-value matching: spans below the minimum are reported as not found;
+# once every value reaches the stop similarity, pending regions are skipped
+DEFAULT_MATCH_MIN_SIMILARITY = 0.8
+DEFAULT_MATCH_STOP_SIMILARITY = 0.95
+
+# Non-option fields of a multipart /extract/match request, sent as JSON form fields
+MATCH_FIELDS = ('regions', 'expected', 'min_similarity', 'stop_similarity')
+
+# Non-option fields of a multipart /jobs request, sent as JSON form fields
+JOB_FIELDS = ('priority', *MATCH_FIELDS)
+
+# Upper bound for a single long-poll on /jobs/<id>
+MAX_JOB_WAIT_SECONDS = 30.0
+
+# Concurrent /validate calls made by the OCR-and-validate pipeline
+DEFAULT_VALIDATION_WORKERS = 4
+
+# Batch request fields that control execution rather than OCR
+BATCH_CONTROL_FIELDS = ('stream', 'ordered', 'concurrency', 'timeout')
+
+# OCR service instance owned by each batch worker process
+batch_worker_service = None
+
+def init_batch_worker(cache_dir: Optional[str] = None, max_image_bytes: int = DEFAULT_MAX_IMAGE_BYTES,
+                      max_image_pixels: int = DEFAULT_MAX_IMAGE_PIXELS):
+    """Warm up a batch worker process: one core per process, one service instance"""
+    global batch_worker_service
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+    cv2.setNumThreads(1)
+    # Workers keep a private memory cache and share the on-disk tier, if any
+    batch_worker_service = PythonOCRService(workers=1, cache_dir=cache_dir, max_image_bytes=max_image_bytes,
+                                            max_image_pixels=max_image_pixels)
+
+def run_batch_item(image_bytes: bytes, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Run OCR for one batch item inside a worker process"""
+    return batch_worker_service.perform_ocr(image_bytes, options)
+
 class PythonOCRService:
     """Enhanced OCR service using Python Tesseract with preprocessing"""
 
-    def __init__(self, host='localhost', port=5000):
+    def __init__(self, host='localhost', port=5000, mode='development', workers=None,
+                 queue_size=None, drain_timeout=30.0, batch_workers=None, cache_entries=512,
+                 cache_mb=64, cache_dir=None, cache_phash_distance=None, max_sessions=64,
+                 session_ttl=1800.0, job_workers=None, job_queue_size=64, job_ttl=600.0,
+                 max_image_bytes=DEFAULT_MAX_IMAGE_BYTES, max_image_pixels=DEFAULT_MAX_IMAGE_PIXELS,
+                 llm_url=DEFAULT_LLM_URL, validation_workers=DEFAULT_VALIDATION_WORKERS,
+                 validation_timeout=DEFAULT_VALIDATION_TIMEOUT):
         self.host = host
         self.port = port
         self.app = Flask(__name__)
         self.server = None
         self.server_thread = None
+        self.started_at = time.time()
+
+        # Stage latency histograms, image sizes and per-endpoint in-flight counts
+        self.metrics = OCRMetrics()
+
+        # Serving mode: 'development' keeps the single-threaded server,
+        # 'production' serves on a bounded worker pool sized to the cores
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size if queue_size is not None else self.workers * 4
+        self.drain_timeout = drain_timeout
+
+        # Decode budget per image; larger images are decoded reduced or rejected
+        self.max_image_bytes = max_image_bytes
+        self.max_image_pixels = max_image_pixels
+
+        # Process pool for /extract/batch, created on first use and kept warm
+        self.batch_workers = batch_workers or os.cpu_count() or 1
+        self.batch_pool = None
+        self.batch_pool_lock = threading.Lock()
+
+        # Threads for OCR of several regions of one image
+        self.region_executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ocr-region')
+
+        # Threads for recognizing detected text blocks (kept apart from region
+        # threads so a region task never waits on its own pool)
+        self.block_executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ocr-block')
+
+        # OCR result cache keyed by decoded pixels + normalized options (0 entries disables it)
+        self.result_cache = OCRResultCache(
+            max_entries=cache_entries,
+            max_bytes=int(cache_mb * 1024 * 1024),
+            phash_distance=cache_phash_distance,
+            disk_dir=cache_dir
+        ) if cache_entries > 0 else None
+
+        # Per-band results of the last capture of each incremental OCR session
+        self.sessions = OCRSessionStore(max_sessions=max_sessions, ttl_seconds=session_ttl)
+
+        # Asynchronous job queue for long OCR jobs (submit, then poll or long-poll)
+        self.job_queue = OCRJobQueue(
+            workers=job_workers or self.workers,
+            max_queued=job_queue_size,
+            result_ttl=job_ttl
+        )
+
+        # Pipeline validation: OCR text goes straight to the LLM server's /validate
+        # on its own threads, so validation of one field overlaps OCR of the next
+        self.validator = ValidationClient(llm_url, timeout=validation_timeout)
+        self.validation_executor = ThreadPoolExecutor(max_workers=validation_workers,
+                                                      thread_name_prefix='ocr-validate')
+
+        # Persistent in-process Tesseract handles (falls back to pytesseract)
+        self.engine_pool = TesseractEnginePool(
+            max_engines_per_key=self.workers if mode == 'production' else None
+        )
+
+        # Transfer accounting for the binary upload endpoints
+        self.transfer_stats_lock = threading.Lock()
+        self.transfer_stats = {
+            'binary_requests': 0,
+            'bytes_saved': 0,
+            'estimated_ms_saved': 0.0,
+            # Observed base64 decode cost on the JSON endpoints (ms per MB)
+            'base64_decode_ms_per_mb': DEFAULT_BASE64_DECODE_MS_PER_MB,
+            'json_samples': 0
+        }
 
         # Configure routes
         self.setup_routes()
@@ -46,10 +228,68 @@ class PythonOCRService:
     def setup_routes(self):
         """Setup Flask routes for OCR operations"""
 
+        @self.app.before_request
+        def track_request_start():
+            g.metrics_endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+            g.metrics_start = time.perf_counter()
+            self.metrics.request_started(g.metrics_endpoint)
+
+        @self.app.after_request
+        def track_request_end(response):
+            if 'metrics_endpoint' not in g:
+                return response
+            endpoint, start, status = g.metrics_endpoint, g.metrics_start, response.status_code
+
+            def finish():
+                self.metrics.request_finished(endpoint, status, (time.perf_counter() - start) * 1000)
+
+            # A streamed body (NDJSON batches) is still running here; count it once the server closes it
+            if response.is_streamed:
+                response.call_on_close(finish)
+            else:
+                finish()
+            return response
+
+        @self.app.route('/metrics', methods=['GET'])
+        def get_metrics():
+            """Stage latency histograms by language/psm, image sizes, cache, queue and in-flight stats"""
+            with self.transfer_stats_lock:
+                transfer = dict(self.transfer_stats)
+            return jsonify({
+                'service': 'python-ocr',
+                'uptimeSeconds': int(time.time() - self.started_at),
+                **self.metrics.snapshot(),
+                'serving': self.server.stats() if isinstance(self.server, PooledWSGIServer) else None,
+                'jobs': self.job_queue.get_stats(),
+                'batchPool': {'workers': self.batch_workers, 'started': self.batch_pool is not None},
+                'cache': self.result_cache.get_stats() if self.result_cache else None,
+                'sessions': self.sessions.get_stats(),
+                'validation': self.validator.get_stats(),
+                'engines': self.engine_pool.stats(),
+                'transfer': transfer
+            })
+
         @self.app.route('/health', methods=['GET'])
         def health_check():
             """Health check endpoint"""
-            return jsonify({'status': 'healthy', 'service': 'python-ocr'})
+            with self.transfer_stats_lock:
+                transfer = {
+                    'binaryRequests': self.transfer_stats['binary_requests'],
+                    'bytesSaved': self.transfer_stats['bytes_saved'],
+                    'estimatedMsSaved': round(self.transfer_stats['estimated_ms_saved'], 1)
+                }
+            return jsonify({
+                'status': 'healthy',
+                'service': 'python-ocr',
+                'mode': self.mode,
+                'serving': self.server.stats() if isinstance(self.server, PooledWSGIServer) else None,
+                'transfer': transfer,
+                'engines': self.engine_pool.stats(),
+                'cache': self.result_cache.get_stats() if self.result_cache else None,
+                'sessions': self.sessions.get_stats(),
+                'jobs': self.job_queue.get_stats(),
+                'validation': self.validator.get_stats()
+            })
 
         @self.app.route('/extract', methods=['POST'])
         def extract_text():
@@ -67,25 +307,25 @@ class PythonOCRService:
                     image_data = image_data.split(',')[1]
 
                 try:
+                    decode_start = time.time()
                     image_bytes = base64.b64decode(image_data)
                     if len(image_bytes) == 0:
                         return jsonify({'error': 'Image data is empty'}), 400
-                    
-                    # Validate image format
-                    try:
-                        test_image = Image.open(BytesIO(image_bytes))
-                        test_image.verify()
-                    except Exception as img_err:
-                        return jsonify({'error': f'Invalid image format: {str(img_err)}'}), 400
-                        
+                    base64_ms = (time.time() - decode_start) * 1000
+                    self.record_base64_decode(len(image_bytes), base64_ms)
+                    self.metrics.observe_stage('base64', base64_ms, options.get('language', 'eng'),
+                                               options.get('psm', 6))
+
                 except Exception as decode_err:
                     return jsonify({'error': f'Failed to decode base64 image: {str(decode_err)}'}), 400
 
-                # Extract text
+                # Extract text (the image is decoded once inside, invalid data raises ValueError)
                 result = self.perform_ocr(image_bytes, options)
 
-                return jsonify(result)
+                return self.json_response(result, options)
 
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
             except Exception as e:
                 logger.error(f"OCR extraction failed: {str(e)}")
                 return jsonify({'error': str(e)}), 500
@@ -101,8 +341,9 @@ class PythonOCRService:
                 images = data['images']
                 options = data.get('options', {})
 
-                results = []
-                for img_data in images:
+                items = []
+                for index, img_data in enumerate(images):
+                    item_id = img_data.get('id', str(index))
                     try:
                         # Decode base64 image
                         image_data = img_data.get('image', '')
@@ -115,30 +356,221 @@ class PythonOCRService:
                         image_bytes = base64.b64decode(image_data)
                         if len(image_bytes) == 0:
                             raise ValueError('Image data is empty')
-                        
-                        # Validate image format
-                        test_image = Image.open(BytesIO(image_bytes))
-                        test_image.verify()
-
-                        # Extract text
-                        result = self.perform_ocr(image_bytes, options)
-                        results.append({
-                            'id': img_data.get('id', str(len(results))),
-                            'result': result
-                        })
+
+                        items.append({'id': item_id, 'image_bytes': image_bytes})
 
                     except Exception as e:
-                        results.append({
-                            'id': img_data.get('id', str(len(results))),
-                            'error': str(e)
-                        })
+                        items.append({'id': item_id, 'error': str(e)})
 
-                return jsonify({'results': results})
+                controls = {key: data.get(key) for key in BATCH_CONTROL_FIELDS}
+                return self.batch_response(items, options, controls)
 
             except Exception as e:
                 logger.error(f"Batch OCR extraction failed: {str(e)}")
                 return jsonify({'error': str(e)}), 500
 
+        @self.app.route('/extract/raw', methods=['POST'])
+        def extract_text_raw():
+            """Extract text from a raw application/octet-stream body"""
+            try:
+                # get_data(cache=False) hands over the body without keeping a second copy
+                image_bytes = request.get_data(cache=False)
+                if not image_bytes:
+                    return jsonify({'error': 'Image data is empty'}), 400
+
+                options = self.options_from_headers(request.headers)
+                result = self.perform_ocr(image_bytes, options)
+                result['transfer'] = self.record_binary_transfer(len(image_bytes), 'octet-stream')
+
+                return self.json_response(result, options)
+
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            except Exception as e:
+                logger.error(f"Raw OCR extraction failed: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
+        @self.app.route('/extract/multipart', methods=['POST'])
+        def extract_text_multipart():
+            """Extract text from a multipart/form-data upload (file field `image`)"""
+            try:
+                upload = request.files.get('image')
+                if upload is None:
+                    return jsonify({'error': 'No image file provided'}), 400
+
+                image_bytes = upload.read()
+                if not image_bytes:
+                    return jsonify({'error': 'Image data is empty'}), 400
+
+                options = self.options_from_form(request.form)
+                result = self.perform_ocr(image_bytes, options)
+                result['transfer'] = self.record_binary_transfer(len(image_bytes), 'multipart')
+
+                return self.json_response(result, options)
+
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            except Exception as e:
+                logger.error(f"Multipart OCR extraction failed: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
+        @self.app.route('/extract/batch/multipart', methods=['POST'])
+        def extract_batch_multipart():
+            """Extract text from several files uploaded under the `images` field"""
+            try:
+                uploads = request.files.getlist('images')
+                if not uploads:
+                    return jsonify({'error': 'No images provided'}), 400
+
+                options = self.options_from_form(request.form)
+                controls = {key: options.pop(key, None) for key in BATCH_CONTROL_FIELDS}
+
+                items = []
+                for index, upload in enumerate(uploads):
+                    item_id = upload.filename or str(index)
+                    image_bytes = upload.read()
+                    if not image_bytes:
+                        items.append({'id': item_id, 'error': 'Image data is empty'})
+                        continue
+                    items.append({
+                        'id': item_id,
+                        'image_bytes': image_bytes,
+                        'transfer': self.record_binary_transfer(len(image_bytes), 'multipart')
+                    })
+
+                return self.batch_response(items, options, controls)
+
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            except Exception as e:
+                logger.error(f"Multipart batch OCR extraction failed: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
+        @self.app.route('/extract/regions', methods=['POST'])
+        def extract_regions():
+            """Extract text from several named regions of one image
+
+            Accepts JSON (`image` base64, `options`, `regions`) or multipart
+            (file `image`, `regions` as a JSON field, options as in
+            /extract/multipart). Each region
+            has `name`, `left`, `top`, `width`, `height` and optional `options`.
+            """
+            try:
+                image_bytes, data = self.read_image_payload(('regions',))
+                regions = data.get('regions') or []
+                if not regions:
+                    return jsonify({'error': 'No regions provided'}), 400
+
+                return jsonify(self.extract_regions(image_bytes, regions, data.get('options', {})))
+
+            except (ValueError, TypeError) as e:
+                return jsonify({'error': str(e)}), 400
+            except Exception as e:
+                logger.error(f"Region OCR extraction failed: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
+        @self.app.route('/extract/match', methods=['POST'])
+        def extract_match():
+            """Find expected values in an image and return only the best match per value
+
+            Accepts JSON (`image` base64, `options`, `expected`, optional `regions`)
+            or multipart (file `image`, MATCH_FIELDS as JSON fields, options as
+            in /extract/multipart). Each expected value has `value`, optional `id`, `field_type` and `region` (a region
+            name to restrict the search to).
+            """
+            try:
+                image_bytes, data = self.read_image_payload(MATCH_FIELDS)
+                if not data.get('expected'):
+                    return jsonify({'error': 'No expected values provided'}), 400
+
+                return jsonify(self.match_expected_values(
+                    image_bytes,
+                    data['expected'],
+                    data.get('regions') or [],
+                    data.get('options', {}),
+                    min_similarity=float(data.get('min_similarity', DEFAULT_MATCH_MIN_SIMILARITY)),
+                    stop_similarity=float(data.get('stop_similarity', DEFAULT_MATCH_STOP_SIMILARITY))
+                ))
+
+            except (ValueError, TypeError, KeyError) as e:
+                return jsonify({'error': str(e)}), 400
+            except Exception as e:
+                logger.error(f"Expected-value matching failed: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
+        @self.app.route('/pipeline/validate', methods=['POST'])
+        def pipeline_validate():
+            """OCR field regions and validate each against its CSV value in one request
+
+            Accepts JSON (`image` base64, `options`, `fields`) or multipart (file
+            `image`, `fields` as a JSON field, options as in /extract/multipart).
+            Each field has `csv_value`, `region` (`left`, `top`, `width`,
+            `height`, optional `options`), optional `id`, `field_name`,
+            `field_type` and `locate` (validate only the span that best matches
+            the CSV value instead of the whole region text).
+            """
+            try:
+                image_bytes, data = self.read_image_payload(('fields',))
+                if not data.get('fields'):
+                    return jsonify({'error': 'No fields provided'}), 400
+
+                return jsonify(self.validate_fields(image_bytes, data['fields'], data.get('options', {})))
+
+            except (ValueError, TypeError, KeyError) as e:
+                return jsonify({'error': str(e)}), 400
+            except Exception as e:
+                logger.error(f"OCR validation pipeline failed: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
+        @self.app.route('/jobs', methods=['POST'])
+        def submit_job():
+            """Queue an OCR job and return its id without waiting for the result
+
+            Accepts JSON (`image` base64) or multipart (file `image`, JOB_FIELDS
+            as JSON fields, options as in /extract/multipart) with `options`,
+            optional `priority` (higher runs first), and optional `regions`
+            and/or `expected` to run a region extraction or an expected-value
+            match instead of a plain extraction.
+            """
+            try:
+                image_bytes, data = self.read_image_payload(JOB_FIELDS)
+                job, deduplicated = self.submit_job(image_bytes, data)
+                response = jsonify({**job.to_dict(), 'deduplicated': deduplicated})
+                response.headers['Location'] = f'/jobs/{job.id}'
+                return response, 202
+
+            except QueueFullError as e:
+                response = jsonify({'error': str(e), 'retryAfter': e.retry_after})
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response, 503
+            except (ValueError, TypeError) as e:
+                return jsonify({'error': str(e)}), 400
+            except Exception as e:
+                logger.error(f"OCR job submission failed: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
+        @self.app.route('/jobs/<job_id>', methods=['GET'])
+        def get_job(job_id):
+            """Job status and result; `?wait=<seconds>` long-polls until it finishes"""
+            try:
+                wait_seconds = min(float(request.args.get('wait', 0)), MAX_JOB_WAIT_SECONDS)
+            except ValueError:
+                return jsonify({'error': 'wait must be a number of seconds'}), 400
+            job = self.job_queue.wait(job_id, wait_seconds)
+            if job is None:
+                return jsonify({'error': 'Job not found or expired'}), 404
+            return jsonify(job.to_dict())
+
+        @self.app.route('/jobs/<job_id>', methods=['DELETE'])
+        def cancel_job(job_id):
+            """Cancel a job that has not started yet"""
+            return jsonify({'jobId': job_id, 'cancelled': self.job_queue.cancel(job_id)})
+
+        @self.app.route('/sessions/<session>', methods=['DELETE'])
+        def drop_session(session):
+            """Forget the stored bands of an incremental OCR session"""
+            return jsonify({'session': session, 'dropped': self.sessions.drop(session)})
+
         @self.app.route('/languages', methods=['GET'])
         def get_languages():
             """Get available languages"""
@@ -149,73 +581,933 @@ class PythonOCRService:
                 logger.error(f"Failed to get languages: {str(e)}")
                 return jsonify({'error': str(e)}), 500
 
-    def preprocess_image(self, image_bytes: bytes, options: Dict[str, Any]) -> np.ndarray:
-        """Preprocess image for better OCR accuracy"""
+    def get_batch_pool(self) -> ProcessPoolExecutor:
+        """Return the warm batch process pool, creating it on first use"""
+        with self.batch_pool_lock:
+            if self.batch_pool is None:
+                # spawn avoids forking a process that holds server threads and engine handles
+                self.batch_pool = ProcessPoolExecutor(
+                    max_workers=self.batch_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=init_batch_worker,
+                    initargs=(self.result_cache.disk_dir if self.result_cache else None,
+                              self.max_image_bytes, self.max_image_pixels)
+                )
+                logger.info(f"Started batch process pool with {self.batch_workers} workers")
+            return self.batch_pool
+
+    def reset_batch_pool(self, pool: ProcessPoolExecutor):
+        """Discard a broken batch pool so the next batch starts a fresh one
+
+        Only `pool` is discarded: a late failure from an older pool must not
+        shut down the one another request has already replaced it with.
+        """
+        with self.batch_pool_lock:
+            if self.batch_pool is pool:
+                self.batch_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def recycle_batch_pool(self, pool: ProcessPoolExecutor):
+        """Kill the workers of a pool still busy with timed-out items; the next batch starts a fresh one
+
+        A running item can't be cancelled, so terminating its process is the
+        only way to bound how long a timed-out batch occupies the pool. Items
+        of other batches running in the same pool fail as worker crashes.
+        """
+        with self.batch_pool_lock:
+            if self.batch_pool is pool:
+                self.batch_pool = None
+        # ProcessPoolExecutor has no public terminate before Python 3.14
+        for process in list((getattr(pool, '_processes', None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+        logger.warning("Recycled the batch process pool after a batch timeout")
+
+    def iter_batch_results(self, items: List[Dict[str, Any]], options: Dict[str, Any], ordered: bool = False,
+                           concurrency: Optional[int] = None, timeout: Optional[float] = None):
+        """Run batch items on the process pool and yield results as they complete
+
+        Yields `{'id', 'result'}` or `{'id', 'error'}` per item, in completion
+        order unless `ordered` is set. At most `concurrency` items are in the
+        pool at once, and items still unfinished after `timeout` seconds are
+        reported as timed out; workers still running them are terminated so
+        the timeout also bounds how long the batch holds the pool.
+        """
+        concurrency = max(1, int(concurrency or self.batch_workers))
+        deadline = time.time() + float(timeout) if timeout else None
+
+        queued = list(enumerate(items))
+        queued.reverse()
+        running = {}
+        # Pool each item went to (a crash mid-batch replaces the pool)
+        pools = {}
+        finished = {}
+        next_to_yield = 0
+
+        def emit(index, entry):
+            nonlocal next_to_yield
+            if not ordered:
+                yield entry
+                return
+            finished[index] = entry
+            while next_to_yield in finished:
+                yield finished.pop(next_to_yield)
+                next_to_yield += 1
+
+        def fill():
+            # Items that failed validation complete immediately
+            while queued and len(running) < concurrency:
+                index, item = queued.pop()
+                if 'error' in item:
+                    yield from emit(index, {'id': item['id'], 'error': item['error']})
+                    continue
+                pool = self.get_batch_pool()
+                try:
+                    future = pool.submit(run_batch_item, item['image_bytes'], options)
+                except BrokenProcessPool as e:
+                    self.reset_batch_pool(pool)
+                    yield from emit(index, {'id': item['id'], 'error': f'Batch worker crashed: {str(e)}'})
+                    continue
+                running[future] = (index, item)
+                pools[future] = pool
+
+        def collect(future):
+            index, item = running.pop(future)
+            try:
+                result = future.result()
+                # Workers run in other processes, so their stages are recorded here
+                self.metrics.observe_result(result, options, len(item['image_bytes']))
+                if 'transfer' in item:
+                    result['transfer'] = item['transfer']
+                entry = {'id': item['id'], 'result': result}
+            except BrokenProcessPool as e:
+                self.reset_batch_pool(pools[future])
+                entry = {'id': item['id'], 'error': f'Batch worker crashed: {str(e)}'}
+            except Exception as e:
+                entry = {'id': item['id'], 'error': str(e)}
+            yield from emit(index, entry)
+
+        yield from fill()
+        while running:
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                break
+
+            done, _ = wait(running, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+
+            for future in done:
+                yield from collect(future)
+            yield from fill()
+
+        # Items that finished or failed validation keep their own outcome
+        for future in [future for future in running if future.done()]:
+            yield from collect(future)
+        timed_out = []
+        for index, item in reversed(queued):
+            if 'error' in item:
+                yield from emit(index, {'id': item['id'], 'error': item['error']})
+            else:
+                timed_out.append((index, item))
+
+        # Anything else ran past the batch timeout
+        busy_pools = []
+        for future, pair in running.items():
+            timed_out.append(pair)
+            if not future.cancel() and pools[future] not in busy_pools:
+                busy_pools.append(pools[future])
+        for pool in busy_pools:
+            self.recycle_batch_pool(pool)
+        for index, item in sorted(timed_out, key=lambda pair: pair[0]):
+            yield from emit(index, {'id': item['id'], 'error': f'Batch timeout after {timeout}s'})
+
+    def batch_response(self, items: List[Dict[str, Any]], options: Dict[str, Any], controls: Dict[str, Any]):
+        """Build either a streamed NDJSON or a buffered JSON batch response"""
+        stream = controls.get('stream') in (True, 'true', '1') or \
+            'application/x-ndjson' in request.headers.get('Accept', '')
+        ordered = controls.get('ordered') in (True, 'true', '1')
+        concurrency = controls.get('concurrency')
+        timeout = controls.get('timeout')
+
+        if not stream:
+            # Buffered responses keep the input order, as before
+            results = list(self.iter_batch_results(items, options, True, concurrency, timeout))
+            return jsonify({'results': results})
+
+        def generate():
+            start_time = time.time()
+            count = 0
+            for entry in self.iter_batch_results(items, options, ordered, concurrency, timeout):
+                count += 1
+                yield json.dumps(entry) + '\n'
+            yield json.dumps({'done': True, 'count': count,
+                              'processingTime': int((time.time() - start_time) * 1000)}) + '\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    def decode_image_buffer(self, image_bytes: bytes, grayscale: bool = False,
+                            reduction: int = 1) -> Optional[np.ndarray]:
+        """Decode an encoded image straight from the request buffer
+
+        np.frombuffer wraps the bytes without copying them and cv2.imdecode
+        decodes directly to 8-bit grayscale (or BGR), at 1/2, 1/4 or 1/8 size
+        when `reduction` asks for it (JPEG is then decoded at reduced size by
+        libjpeg). Formats OpenCV can't read (e.g. GIF) go through PIL.
+        Returns None for invalid data.
+        """
+        buffer = np.frombuffer(image_bytes, dtype=np.uint8)
+        if reduction > 1:
+            flag = REDUCED_DECODE_FLAGS[reduction][0 if grayscale else 1]
+        else:
+            flag = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+        image = cv2.imdecode(buffer, flag)
+        if image is not None:
+            return image
+
+        try:
+            pil_image = Image.open(BytesIO(image_bytes))
+            pil_image = pil_image.convert('L' if grayscale else 'RGB')
+            if reduction > 1:
+                pil_image = pil_image.reduce(reduction)
+            if grayscale:
+                return np.array(pil_image)
+            return cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+        except Exception:
+            return None
+
+    @staticmethod
+    def read_image_size(image_bytes: bytes) -> Optional[Tuple[int, int, str]]:
+        """(width, height, format) from the image header, without decoding pixels
+
+        Raises ValueError for images past PIL's decompression bomb limit, which
+        is far above any pixel budget; returns None for an unreadable header.
+        """
+        try:
+            with warnings.catch_warnings():
+                # The pixel budget is enforced by plan_decode, not by PIL's warning threshold
+                warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+                with Image.open(BytesIO(image_bytes)) as pil_image:
+                    return pil_image.size[0], pil_image.size[1], pil_image.format
+        except Image.DecompressionBombError as e:
+            raise ValueError(f'Image exceeds the pixel limit: {str(e)}')
+        except Exception:
+            return None
+
+    def plan_decode(self, image_bytes: bytes, options: Dict[str, Any],
+                    allow_scale_reduction: bool = True) -> Dict[str, Any]:
+        """Choose the decode reduction (1, 2, 4 or 8) for a request within the budget
+
+        An explicit downscale (`scale` <= 0.5, not in auto mode) is applied
+        while decoding, leaving the remainder to the scale stage. Images over
+        the pixel budget are decoded at the smallest reduction that fits;
+        only JPEG is decoded natively at reduced size, so other formats must
+        fit the budget at full size. Images whose size can't be read from the
+        header are rejected, since their decode cost can't be bounded.
+        """
+        if len(image_bytes) > self.max_image_bytes:
+            raise ValueError(f'Image is {len(image_bytes)} bytes; the limit is {self.max_image_bytes}')
+
+        scale_reduction = 1
+        scale = float(options.get('scale', 1) or 1)
+        if allow_scale_reduction and not options.get('auto') and options.get('reduced_decode', True) is not False:
+            scale_reduction = next((factor for factor in (8, 4, 2) if scale * factor <= 1), 1)
+
+        size = self.read_image_size(image_bytes)
+        if size is None:
+            raise ValueError('Invalid image format: unreadable image header')
+        width, height, image_format = size
+        # OpenCV decodes other formats at full size before reducing them
+        factors = (1, 2, 4, 8) if image_format == 'JPEG' else (1,)
+        fitting = [factor for factor in factors
+                   if -(-width // factor) * -(-height // factor) <= self.max_image_pixels]
+        if not fitting:
+            raise ValueError(f'Image is {width}x{height} pixels; the limit is {self.max_image_pixels} pixels')
+
+        return {
+            'reduction': max(scale_reduction, fitting[0]),
+            'scaleReduction': scale_reduction,
+            'sourceWidth': width,
+            'sourceHeight': height
+        }
+
+    def load_image(self, image_bytes: Union[bytes, np.ndarray], options: Dict[str, Any],
+                   timings: Optional[Dict[str, float]] = None, decode: Optional[Dict[str, Any]] = None,
+                   allow_scale_reduction: bool = True) -> np.ndarray:
+        """Decode request bytes once, in the color mode and size preprocessing needs
+
+        The chosen reduction goes into `decode`; callers map crop regions
+        and the remaining scale with `reduce_options`/`reduce_region`.
+        """
+        if isinstance(image_bytes, np.ndarray):
+            return image_bytes
+
+        start_time = time.perf_counter()
+        plan = self.plan_decode(image_bytes, options, allow_scale_reduction)
+        image = self.decode_image_buffer(image_bytes, grayscale=options.get('grayscale', True),
+                                         reduction=plan['reduction'])
+        if image is None:
+            raise ValueError('Invalid image format')
+        if image.shape[0] * image.shape[1] > self.max_image_pixels:
+            raise ValueError(f'Image has {image.shape[0] * image.shape[1]} pixels; the limit is {self.max_image_pixels}')
+        if timings is not None:
+            timings['decode'] = round((time.perf_counter() - start_time) * 1000, 2)
+        if decode is not None:
+            decode.update(plan, width=image.shape[1], height=image.shape[0])
+        return image
+
+    @staticmethod
+    def reduce_region(region: Dict[str, Any], reduction: int) -> Dict[str, Any]:
+        """Map a left/top/width/height region from source to reduced-decode coordinates"""
+        if reduction == 1:
+            return region
+        return {**region, **{key: int(region[key]) // reduction for key in ('left', 'top', 'width', 'height')}}
+
+    def reduce_options(self, options: Dict[str, Any], decode: Dict[str, Any]) -> Dict[str, Any]:
+        """Options for an image decoded at reduced size: remaining scale, crop in decoded pixels"""
+        if decode.get('reduction', 1) == 1:
+            return options
+        options = dict(options)
+        if decode['scaleReduction'] > 1:
+            options['scale'] = float(options.get('scale', 1) or 1) * decode['scaleReduction']
+        crop = options.get('crop_region')
+        if crop and all(key in crop for key in ['left', 'top', 'width', 'height']):
+            options['crop_region'] = self.reduce_region(crop, decode['reduction'])
+        return options
+
+    def options_from_headers(self, headers) -> Dict[str, Any]:
+        """Build OCR options from `X-OCR-Options` (JSON) and `X-OCR-<Name>` headers"""
+        options = {}
+        raw_options = headers.get('X-OCR-Options')
+        if raw_options:
+            try:
+                options.update(json.loads(raw_options))
+            except json.JSONDecodeError as e:
+                raise ValueError(f'Invalid X-OCR-Options header: {str(e)}')
+
+        for name, value in headers.items():
+            if name.lower().startswith(OPTION_HEADER_PREFIX.lower()) and name.lower() != 'x-ocr-options':
+                key = name[len(OPTION_HEADER_PREFIX):].lower().replace('-', '_')
+                options[key] = self.coerce_option_value(key, value)
+
+        return options
+
+    def options_from_form(self, form) -> Dict[str, Any]:
+        """Build OCR options from an `options` JSON field and individual form fields"""
+        options = {}
+        if form.get('options'):
+            try:
+                options.update(json.loads(form['options']))
+            except json.JSONDecodeError as e:
+                raise ValueError(f'Invalid options field: {str(e)}')
+
+        for key, value in form.items():
+            if key != 'options':
+                options[key] = self.coerce_option_value(key, value)
+
+        return options
+
+    def read_image_payload(self, fields: Tuple[str, ...]) -> Tuple[bytes, Dict[str, Any]]:
+        """Image bytes and request fields from a multipart upload or a base64 JSON body
+
+        Multipart requests carry the file `image`, each of `fields` as a JSON
+        form field and the OCR options as read by `options_from_form`.
+        """
+        if request.files:
+            upload = request.files.get('image')
+            if upload is None:
+                raise ValueError('No image file provided')
+            image_bytes = upload.read()
+            data = {key: json.loads(request.form[key]) for key in fields if key in request.form}
+            data['options'] = self.options_from_form(
+                {key: value for key, value in request.form.items() if key not in fields}
+            )
+        else:
+            data = request.get_json()
+            if not data or 'image' not in data:
+                raise ValueError('No image data provided')
+            image_data = data['image']
+            if image_data.startswith('data:image'):
+                image_data = image_data.split(',')[1]
+            image_bytes = base64.b64decode(image_data)
+
+        if not image_bytes:
+            raise ValueError('Image data is empty')
+        return image_bytes, data
+
+    @staticmethod
+    def region_options(options: Dict[str, Any], region: Dict[str, Any], **overrides) -> Dict[str, Any]:
+        """Request options with the region's own overrides; the region replaces any crop_region"""
+        merged = {**options, **{
+            key: value for key, value in (region.get('options') or {}).items()
+            if key in REGION_OPTION_FIELDS
+        }, **overrides}
+        merged.pop('crop_region', None)
+        return merged
+
+    @staticmethod
+    def coerce_option_value(key: str, value: str) -> Any:
+        """Convert a header/form string into the type the JSON API would carry for `key`"""
+        if key in BOOLEAN_OPTION_FIELDS:
+            lowered = value.strip().lower()
+            if lowered in ('true', '1'):
+                return True
+            if lowered in ('false', '0'):
+                return False
+            raise ValueError(f'Option {key} must be true or false')
+        # Numbers and nested objects (e.g. crop_region) arrive as JSON
+        if key in NUMERIC_OPTION_FIELDS or key in JSON_OPTION_FIELDS:
+            try:
+                return json.loads(value)
+            except json.JSONDecodeError:
+                raise ValueError(f'Invalid value for option {key}: {value}')
+        # Text options keep leading zeros and digit-only values (e.g. a whitelist of 0-9)
+        return value
+
+    def record_base64_decode(self, decoded_size: int, elapsed_ms: float):
+        """Calibrate the base64 decode cost from JSON requests"""
+        if decoded_size <= 0:
+            return
+        ms_per_mb = elapsed_ms / (decoded_size / (1024 * 1024))
+        with self.transfer_stats_lock:
+            samples = self.transfer_stats['json_samples']
+            current = self.transfer_stats['base64_decode_ms_per_mb']
+            # Moving average over the most recent requests
+            weight = min(samples, 99)
+            self.transfer_stats['base64_decode_ms_per_mb'] = (current * weight + ms_per_mb) / (weight + 1)
+            self.transfer_stats['json_samples'] = samples + 1
+
+    def record_binary_transfer(self, size: int, mode: str) -> Dict[str, Any]:
+        """Report what a binary upload saved compared with the base64 JSON path"""
+        base64_size = 4 * ((size + 2) // 3)
+        bytes_saved = base64_size - size
+
+        with self.transfer_stats_lock:
+            ms_saved = (size / (1024 * 1024)) * self.transfer_stats['base64_decode_ms_per_mb']
+            self.transfer_stats['binary_requests'] += 1
+            self.transfer_stats['bytes_saved'] += bytes_saved
+            self.transfer_stats['estimated_ms_saved'] += ms_saved
+
+        return {
+            'mode': mode,
+            'bytes': size,
+            'bytesSaved': bytes_saved,
+            'estimatedMsSaved': round(ms_saved, 3)
+        }
+
+    def extract_regions(self, image_bytes: Union[bytes, np.ndarray], regions: List[Dict[str, Any]],
+                        options: Dict[str, Any]) -> Dict[str, Any]:
+        """Decode once and OCR every named region in parallel"""
+        start_time = time.time()
+        timings: Dict[str, float] = {}
+        decode: Dict[str, Any] = {}
+        # Region options may differ, so only the decode budget can reduce the shared image
+        image = self.load_image(image_bytes, options, timings, decode, allow_scale_reduction=False)
+        reduction = decode.get('reduction', 1)
+
+        def run_region(region: Dict[str, Any]) -> Dict[str, Any]:
+            x, y, w, h = self.clamp_region(image.shape, self.reduce_region(region, reduction))
+            region_options = self.region_options(options, region)
+            # A view of the region: preprocessing, caching and OCR only see its pixels
+            result = self.perform_ocr(image[y:y+h, x:x+w], region_options)
+            result['region'] = {'left': x * reduction, 'top': y * reduction,
+                                'width': w * reduction, 'height': h * reduction}
+            return result
+
+        names = [str(region.get('name', index)) for index, region in enumerate(regions)]
+        futures = {name: self.region_executor.submit(run_region, region) for name, region in zip(names, regions)}
+
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                results[name] = {'error': str(e)}
+
+        return {
+            'regions': results,
+            'decode': decode or None,
+            'processingTime': int((time.time() - start_time) * 1000),
+            'stageTimings': timings
+        }
+
+    def submit_job(self, image_bytes: bytes, data: Dict[str, Any]):
+        """Queue an extraction, region extraction or expected-value match as a job"""
+        options = data.get('options', {})
+        regions = data.get('regions') or []
+        expected = data.get('expected') or []
+
+        digest = hashlib.sha256(image_bytes)
+        digest.update(json.dumps([options, regions, expected], sort_keys=True, default=str).encode('utf-8'))
+
+        if expected:
+            def run():
+                return self.match_expected_values(
+                    image_bytes, expected, regions, options,
+                    min_similarity=float(data.get('min_similarity', DEFAULT_MATCH_MIN_SIMILARITY)),
+                    stop_similarity=float(data.get('stop_similarity', DEFAULT_MATCH_STOP_SIMILARITY))
+                )
+        elif regions:
+            def run():
+                return self.extract_regions(image_bytes, regions, options)
+        else:
+            def run():
+                return self.perform_ocr(image_bytes, options)
+
+        return self.job_queue.submit(digest.hexdigest(), run, priority=int(data.get('priority', 0)))
+
+    def match_expected_values(self, image_bytes: Union[bytes, np.ndarray], expected: List[Dict[str, Any]],
+                              regions: List[Dict[str, Any]], options: Dict[str, Any],
+                              min_similarity: float = DEFAULT_MATCH_MIN_SIMILARITY,
+                              stop_similarity: float = DEFAULT_MATCH_STOP_SIMILARITY) -> Dict[str, Any]:
+        """OCR regions in parallel and fuzzy-match expected values as each region finishes
+
+        Without regions the whole image (or `crop_region`) is one region.
+        Match boxes are returned in original image coordinates. Regions still
+        queued once every value has a match at `stop_similarity` are skipped.
+        """
+        start_time = time.time()
+        timings: Dict[str, float] = {}
+        decode: Dict[str, Any] = {}
+        image = self.load_image(image_bytes, options, timings, decode, allow_scale_reduction=False)
+        reduction = decode.get('reduction', 1)
+
+        if not regions:
+            crop = options.get('crop_region')
+            whole = {'left': 0, 'top': 0, 'width': image.shape[1] * reduction, 'height': image.shape[0] * reduction}
+            regions = [{'name': 'image', **(crop if crop else whole)}]
+
+        targets = [
+            {
+                'id': str(item.get('id', index)),
+                'value': item['value'],
+                'field_type': item.get('field_type', 'text'),
+                'region': str(item['region']) if item.get('region') is not None else None,
+                'best': None
+            }
+            for index, item in enumerate(expected)
+        ]
+
+        def run_region(name: str, region: Dict[str, Any]) -> Tuple[str, Tuple[int, int, int, int], Dict[str, Any]]:
+            x, y, w, h = self.clamp_region(image.shape, self.reduce_region(region, reduction))
+            region_options = self.region_options(options, region, format='columnar', word_detail=True)
+            return name, (x, y, w, h), self.perform_ocr(image[y:y+h, x:x+w], region_options)
+
+        futures = {}
+        for index, region in enumerate(regions):
+            name = str(region.get('name', index))
+            futures[self.region_executor.submit(run_region, name, region)] = name
+        pending = set(futures)
+        processed, errors = [], {}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    name, (x, y, w, h), result = future.result()
+                except Exception as e:
+                    errors[futures[future]] = str(e)
+                    continue
+                processed.append(name)
+
+                # Map boxes from the preprocessed region back to the source image
+                scale_x = w / max(1, result['boundingBox']['width'])
+                scale_y = h / max(1, result['boundingBox']['height'])
+                x, y, scale_x, scale_y = x * reduction, y * reduction, scale_x * reduction, scale_y * reduction
+                for target in targets:
+                    if target['region'] not in (None, name):
+                        continue
+                    match = find_best_match(target['value'], target['field_type'], result['words'])
+                    if match is None or (target['best'] and target['best']['similarity'] >= match['similarity']):
+                        continue
+                    bbox = match['bbox']
+                    match['bbox'] = {
+                        'x0': x + int(round(bbox['x0'] * scale_x)),
+                        'y0': y + int(round(bbox['y0'] * scale_y)),
+                        'x1': x + int(round(bbox['x1'] * scale_x)),
+                        'y1': y + int(round(bbox['y1'] * scale_y))
+                    }
+                    match['region'] = name
+                    target['best'] = match
+
+            if all(target['best'] and target['best']['similarity'] >= stop_similarity for target in targets):
+                for future in pending:
+                    future.cancel()
+                break
+
+        matches = []
+        for target in targets:
+            best = target['best'] or {}
+            matches.append({
+                'id': target['id'],
+                'value': target['value'],
+                'fieldType': target['field_type'],
+                'normalized': normalize_value(target['value'], target['field_type']),
+                'found': best.get('similarity', 0.0) >= min_similarity,
+                'match': best.get('match'),
+                'similarity': round(best.get('similarity', 0.0), 4),
+                'confidence': best.get('confidence'),
+                'bbox': best.get('bbox'),
+                'region': best.get('region')
+            })
+
+        return {
+            'matches': matches,
+            'regionsProcessed': processed,
+            'regionsSkipped': len(pending),
+            'earlyStop': bool(pending),
+            'errors': errors or None,
+            'decode': decode or None,
+            'processingTime': int((time.time() - start_time) * 1000),
+            'stageTimings': timings
+        }
+
+    def validate_fields(self, image_bytes: Union[bytes, np.ndarray], fields: List[Dict[str, Any]],
+                        options: Dict[str, Any]) -> Dict[str, Any]:
+        """OCR every field region in parallel and validate each as soon as its text is ready
+
+        OCR runs on the region threads and validation on its own threads, so
+        the LLM call for one field overlaps the OCR of the fields still queued.
+        """
+        start_time = time.time()
+        timings: Dict[str, float] = {}
+        decode: Dict[str, Any] = {}
+        image = self.load_image(image_bytes, options, timings, decode, allow_scale_reduction=False)
+        reduction = decode.get('reduction', 1)
+
+        def run_field(field: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+            region = field.get('region') or {
+                'left': 0, 'top': 0, 'width': image.shape[1] * reduction, 'height': image.shape[0] * reduction
+            }
+            x, y, w, h = self.clamp_region(image.shape, self.reduce_region(region, reduction))
+            region_options = self.region_options(options, region, format='columnar', word_detail=True)
+
+            result = self.perform_ocr(image[y:y+h, x:x+w], region_options)
+            web_value = ' '.join(result['text'].split())
+            confidence = result['confidence']
+            if field.get('locate'):
+                match = find_best_match(field['csv_value'], field.get('field_type', 'text'), result['words'])
+                if match is not None:
+                    web_value, confidence = match['match'], match['confidence']
+            return {
+                'webValue': web_value,
+                'ocrConfidence': confidence,
+                'region': {'left': x * reduction, 'top': y * reduction,
+                           'width': w * reduction, 'height': h * reduction},
+                'ocrMs': result['processingTime']
+            }, region_options
+
+        def validate_field(field: Dict[str, Any], web_value: str, region_options: Dict[str, Any]) -> Dict[str, Any]:
+            validation = self.validator.validate(
+                str(field['csv_value']), web_value,
+                field.get('field_type', 'text'), field.get('field_name', 'unknown')
+            )
+            self.metrics.observe_stage('validate', validation['elapsed_ms'],
+                                       region_options.get('language', 'eng'), region_options.get('psm', 6))
+            return validation
+
+        entries = [
+            {
+                'id': str(field.get('id', field.get('field_name', index))),
+                'fieldName': field.get('field_name', 'unknown'),
+                'fieldType': field.get('field_type', 'text'),
+                'csvValue': str(field['csv_value'])
+            }
+            for index, field in enumerate(fields)
+        ]
+
+        ocr_futures = {self.region_executor.submit(run_field, field): index for index, field in enumerate(fields)}
+        validation_futures = {}
+        for future in as_completed(ocr_futures):
+            index = ocr_futures[future]
+            try:
+                ocr, region_options = future.result()
+            except Exception as e:
+                entries[index].update({'match': False, 'confidence': 0.0, 'error': f'OCR failed: {str(e)}'})
+                continue
+            entries[index].update(ocr)
+            # Hand the text to validation now; remaining regions keep OCRing meanwhile
+            validation_futures[self.validation_executor.submit(
+                validate_field, fields[index], ocr['webValue'], region_options
+            )] = index
+
+        for future, index in validation_futures.items():
+            try:
+                validation = future.result()
+            except Exception as e:
+                validation = {'error': str(e), 'match': False, 'confidence': 0.0, 'elapsed_ms': 0.0}
+            entries[index].update({
+                'match': bool(validation.get('match', False)),
+                'confidence': validation.get('confidence', 0.0),
+                'reasoning': validation.get('reasoning'),
+                'modelUsed': validation.get('model_used'),
+                'fromCache': bool(validation.get('from_cache', False)),
+                'validateMs': int(validation['elapsed_ms']),
+                'error': validation.get('error')
+            })
+
+        return {
+            'fields': entries,
+            'matched': sum(1 for entry in entries if entry.get('match')),
+            'failed': sum(1 for entry in entries if entry.get('error')),
+            'decode': decode or None,
+            'processingTime': int((time.time() - start_time) * 1000),
+            'stageTimings': timings
+        }
+
+    def build_preprocessing_plan(self, image: np.ndarray, options: Dict[str, Any]) -> List[str]:
+        """Ordered preprocessing stages: crop first so later stages only touch the region"""
+        plan = []
+        crop = options.get('crop_region')
+        if crop and all(key in crop for key in ['left', 'top', 'width', 'height']):
+            plan.append('crop')
+        if image.ndim == 3 and options.get('grayscale', True):
+            plan.append('grayscale')
+        if options.get('scale', 1) != 1:
+            plan.append('scale')
+        if options.get('denoise', False):
+            plan.append('denoise')
+        if options.get('enhance_contrast', False):
+            plan.append('enhance_contrast')
+        if options.get('threshold', False):
+            plan.append('threshold')
+        return plan
+
+    @staticmethod
+    def clamp_region(shape: Tuple[int, ...], region: Dict[str, Any]) -> Tuple[int, int, int, int]:
+        """Clamp a left/top/width/height region to the image bounds"""
+        x, y = int(region['left']), int(region['top'])
+        w, h = int(region['width']), int(region['height'])
+        img_h, img_w = shape[:2]
+        x = max(0, min(x, img_w - 1))
+        y = max(0, min(y, img_h - 1))
+        w = max(1, min(w, img_w - x))
+        h = max(1, min(h, img_h - y))
+        return x, y, w, h
+
+    def apply_preprocessing_stage(self, image: np.ndarray, stage: str, options: Dict[str, Any]) -> np.ndarray:
+        """Apply one preprocessing stage"""
+        if stage == 'crop':
+            # crop_region is in coordinates of the original (unscaled) image
+            x, y, w, h = self.clamp_region(image.shape, options['crop_region'])
+            return image[y:y+h, x:x+w]
+
+        if stage == 'grayscale':
+            return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        if stage == 'scale':
+            scale = float(options['scale'])
+            width = max(1, int(image.shape[1] * scale))
+            height = max(1, int(image.shape[0] * scale))
+            interpolation = cv2.INTER_CUBIC if scale > 1 else cv2.INTER_AREA
+            return cv2.resize(image, (width, height), interpolation=interpolation)
+
+        if stage == 'denoise':
+            if options.get('denoise_method') == 'median':
+                return cv2.medianBlur(image, 3)
+            strength = float(options.get('denoise_strength', 3))
+            if image.ndim == 3:
+                return cv2.fastNlMeansDenoisingColored(image, None, strength, strength)
+            return cv2.fastNlMeansDenoising(image, None, strength)
+
+        if stage == 'enhance_contrast':
+            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+            if image.ndim == 3:
+                # Color image
+                lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
+                lab[:, :, 0] = clahe.apply(lab[:, :, 0])
+                return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+            # Grayscale image
+            return clahe.apply(image)
+
+        if stage == 'threshold':
+            if image.ndim == 3:
+                # Otsu needs a single channel
+                image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            _, image = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            return image
+
+        raise ValueError(f'Unknown preprocessing stage: {stage}')
+
+    def analyze_image(self, image: np.ndarray) -> Dict[str, Any]:
+        """Cheap statistics that drive auto preprocessing"""
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        # Work on a reduced copy of large images; heights are mapped back afterwards
+        factor = 1.0
+        if max(gray.shape) > 1600:
+            factor = 1600 / max(gray.shape)
+            gray = cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+
+        # Noise sigma (Immerkaer): response of a Laplacian-difference kernel
+        noise_sigma = 0.0
+        if gray.shape[0] > 2 and gray.shape[1] > 2:
+            kernel = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+            response = cv2.filter2D(gray.astype(np.float32), -1, kernel)[1:-1, 1:-1]
+            noise_sigma = float(np.sqrt(np.pi / 2) * np.abs(response).sum() / (6 * response.size))
+
+        # Contrast: gap between the mean intensities of the two Otsu classes
+        # (percentile spreads read 0 on pages where text covers under 2%)
+        otsu, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+        levels = np.arange(256, dtype=np.float64)
+        split = int(otsu) + 1
+        dark, light = histogram[:split].sum(), histogram[split:].sum()
+        contrast = 0
+        if dark and light:
+            contrast = int(round(levels[split:] @ histogram[split:] / light - levels[:split] @ histogram[:split] / dark))
+
+        # Text height: median height of character-sized connected components
+        if binary.mean() > 127:
+            # Dark text on light background: make the text the foreground
+            binary = cv2.bitwise_not(binary)
+        count, _, components, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        heights = components[1:count, cv2.CC_STAT_HEIGHT]
+        widths = components[1:count, cv2.CC_STAT_WIDTH]
+        areas = components[1:count, cv2.CC_STAT_AREA]
+        character_like = (heights >= 4) & (heights < gray.shape[0] * 0.5) & \
+            (widths < gray.shape[1] * 0.5) & (areas >= 8) & (widths <= heights * 4)
+        text_height = None
+        if int(character_like.sum()) >= 3:
+            text_height = float(np.median(heights[character_like])) / factor
+
+        return {
+            'noiseSigma': round(noise_sigma, 2),
+            'contrastSpread': contrast,
+            'textHeight': round(text_height, 1) if text_height else None,
+            'components': int(character_like.sum())
+        }
+
+    def plan_auto_preprocessing(self, stats: Dict[str, Any], profile: str) -> Dict[str, Any]:
+        """Choose only the transforms the image statistics call for"""
+        accurate = profile == 'accurate'
+        chosen: Dict[str, Any] = {'denoise': False, 'enhance_contrast': False, 'threshold': False, 'scale': 1}
+
+        # Rescale toward Tesseract's preferred text size, shrinking oversized screenshots too
+        low, high = AUTO_TEXT_HEIGHT_RANGE['accurate' if accurate else 'fast']
+        text_height = stats['textHeight']
+        if text_height and not low <= text_height <= high:
+            min_scale, max_scale = AUTO_SCALE_LIMITS
+            chosen['scale'] = round(min(max_scale, max(min_scale, AUTO_TARGET_TEXT_HEIGHT / text_height)), 3)
+
+        if stats['noiseSigma'] > (5 if accurate else 10):
+            chosen['denoise'] = True
+            if accurate:
+                chosen['denoise_strength'] = round(min(15.0, max(3.0, stats['noiseSigma'])), 1)
+            else:
+                # Median blur costs a fraction of non-local means
+                chosen['denoise_method'] = 'median'
+
+        if stats['contrastSpread'] < 100:
+            chosen['enhance_contrast'] = True
+
+        if accurate and (stats['contrastSpread'] < 60 or stats['noiseSigma'] > 8):
+            chosen['threshold'] = True
+
+        return chosen
+
+    def preprocess_image(self, image_bytes: Union[bytes, np.ndarray], options: Dict[str, Any],
+                         timings: Optional[Dict[str, float]] = None,
+                         details: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """Preprocess image for better OCR accuracy
+
+        Decodes once (straight to grayscale by default), crops to
+        `crop_region`, then scales, denoises, enhances contrast and
+        thresholds the crop only. With `auto` the transforms are chosen
+        from image statistics instead of the request flags, using the
+        `fast` (default) or `accurate` profile. Per-stage milliseconds go
+        into `timings`; applied stages and auto decisions into `details`.
+        """
+        timings = timings if timings is not None else {}
+        details = details if details is not None else {}
+        details['stages'] = []
+        image = self.load_image(image_bytes, options, timings)
+        opencv_image = image
+
+        def run_stages(stages, stage_options):
+            nonlocal opencv_image
+            for stage in stages:
+                start_time = time.perf_counter()
+                opencv_image = self.apply_preprocessing_stage(opencv_image, stage, stage_options)
+                timings[stage] = round((time.perf_counter() - start_time) * 1000, 2)
+                details['stages'].append(stage)
+
         try:
-            # Convert bytes to PIL Image
-            image = Image.open(BytesIO(image_bytes))
-
-            # Convert to RGB if necessary
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-
-            # Convert PIL to OpenCV format
-            opencv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-
-            # Apply preprocessing based on options
-            if options.get('grayscale', True):
-                opencv_image = cv2.cvtColor(opencv_image, cv2.COLOR_BGR2GRAY)
-
-            if options.get('denoise', False):
-                opencv_image = cv2.fastNlMeansDenoising(opencv_image)
-
-            if options.get('enhance_contrast', False):
-                if len(opencv_image.shape) == 3:
-                    # Color image
-                    lab = cv2.cvtColor(opencv_image, cv2.COLOR_BGR2LAB)
-                    lab[:, :, 0] = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)).apply(lab[:, :, 0])
-                    opencv_image = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
-                else:
-                    # Grayscale image
-                    opencv_image = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)).apply(opencv_image)
-
-            if options.get('threshold', False):
-                _, opencv_image = cv2.threshold(opencv_image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-
-            if options.get('scale', 1) != 1:
-                scale = options['scale']
-                width = int(opencv_image.shape[1] * scale)
-                height = int(opencv_image.shape[0] * scale)
-                opencv_image = cv2.resize(opencv_image, (width, height), interpolation=cv2.INTER_CUBIC)
-
-            # Crop region if specified
-            if 'crop_region' in options and options['crop_region']:
-                crop = options['crop_region']
-                if all(key in crop for key in ['left', 'top', 'width', 'height']):
-                    x, y, w, h = crop['left'], crop['top'], crop['width'], crop['height']
-                    # Validate crop region bounds
-                    img_h, img_w = opencv_image.shape[:2]
-                    x = max(0, min(x, img_w))
-                    y = max(0, min(y, img_h))
-                    w = max(1, min(w, img_w - x))
-                    h = max(1, min(h, img_h - y))
-                    opencv_image = opencv_image[y:y+h, x:x+w]
+            plan = self.build_preprocessing_plan(image, options)
+            if not options.get('auto'):
+                run_stages(plan, options)
+                return opencv_image
+
+            # Statistics must describe the region that will be recognized
+            run_stages([stage for stage in plan if stage in ('crop', 'grayscale')], options)
+
+            start_time = time.perf_counter()
+            profile = options.get('profile', 'fast')
+            stats = self.analyze_image(opencv_image)
+            auto_options = {**options, **self.plan_auto_preprocessing(stats, profile)}
+            timings['analyze'] = round((time.perf_counter() - start_time) * 1000, 2)
+            details['auto'] = {'profile': profile, 'stats': stats}
+
+            run_stages([
+                stage for stage in self.build_preprocessing_plan(opencv_image, auto_options)
+                if stage not in ('crop', 'grayscale')
+            ], auto_options)
 
             return opencv_image
 
         except Exception as e:
             logger.error(f"Image preprocessing failed: {str(e)}")
             # Return original image if preprocessing fails
-            image = Image.open(BytesIO(image_bytes))
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            return cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-
-    def perform_ocr(self, image_bytes: bytes, options: Dict[str, Any]) -> Dict[str, Any]:
-        """Perform OCR on image with preprocessing"""
+            details['stages'] = []
+            return image
+
+    def perform_ocr(self, image_bytes: Union[bytes, np.ndarray], options: Dict[str, Any]) -> Dict[str, Any]:
+        """Perform OCR on image with preprocessing, serving repeats from the result cache"""
+        timings: Dict[str, float] = {}
+        decode: Dict[str, Any] = {}
+        self.check_tiling_options(options)
+        image = self.load_image(image_bytes, options, timings, decode)
+        options = self.reduce_options(options, decode)
+
+        # Session captures report changes against the previous capture, so they bypass the cache
+        if self.result_cache is None or options.get('cache') is False or options.get('session'):
+            result = self.run_ocr(image, options, timings)
+        else:
+            start_time = time.time()
+            cached, tier, context = self.result_cache.get(image, options)
+            if cached is not None:
+                result = cached
+                result['cache'] = {'hit': True, 'tier': tier, 'lookupTime': int((time.time() - start_time) * 1000)}
+                result['stageTimings'] = timings
+            else:
+                result = self.run_ocr(image, options, timings)
+                self.result_cache.put(context, result)
+                result['cache'] = {'hit': False, 'tier': tier}
+
+        result['decode'] = decode or None
+        if batch_worker_service is not self:
+            self.metrics.observe_result(result, options, len(image_bytes) if isinstance(image_bytes, bytes) else None)
+        # The per-request stage breakdown is optional
+        if options.get('stage_timings') is False:
+            result.pop('stageTimings', None)
+        return result
+
+    def json_response(self, result: Dict[str, Any], options: Dict[str, Any]):
+        """jsonify an OCR result, recording serialization time"""
+        start_time = time.perf_counter()
+        response = jsonify(result)
+        self.metrics.observe_stage('serialize', (time.perf_counter() - start_time) * 1000,
+                                   options.get('language', 'eng'), options.get('psm', 6))
+        return response
+
+    def run_ocr(self, image_bytes: Union[bytes, np.ndarray], options: Dict[str, Any],
+                timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Run preprocessing and recognition without consulting the cache"""
         try:
+            timings = timings if timings is not None else {}
+
             # Preprocess image
-            processed_image = self.preprocess_image(image_bytes, options)
+            details: Dict[str, Any] = {}
+            processed_image = self.preprocess_image(image_bytes, options, timings, details)
 
             # Configure Tesseract
             config_parts = []
@@ -248,71 +1540,48 @@ class PythonOCRService:
             start_time = time.time()
 
             # Extract text and data
-            data = pytesseract.image_to_data(
-                processed_image,
-                config=config_string,
-                output_type=pytesseract.Output.DICT
-            )
-
-            text = pytesseract.image_to_string(processed_image, config=config_string)
+            text_blocks = None
+            tiles = None
+            incremental = None
+            if options.get('session'):
+                data, text, engine, incremental = self.recognize_incremental(
+                    processed_image, options, config_string, str(options['session'])
+                )
+            elif self.should_tile(processed_image, options):
+                # Tiling takes precedence over block detection
+                data, text, engine, tiles = self.recognize_tiles(processed_image, options, config_string)
+            elif options.get('detect_text'):
+                data, text, engine, text_blocks = self.recognize_text_blocks(processed_image, options, config_string)
+            else:
+                data, text, engine = self.run_recognition(processed_image, options, config_string)
 
             processing_time = int((time.time() - start_time) * 1000)  # Convert to milliseconds
+            timings['recognition'] = round((time.time() - start_time) * 1000, 2)
 
             # Parse word-level data
-            words = []
-            lines = {}
-
-            n_boxes = len(data['text'])
-            for i in range(n_boxes):
-                if int(data['conf'][i]) > 0:  # Only include confident words
-                    word_data = {
-                        'text': data['text'][i],
-                        'confidence': float(data['conf'][i]) / 100.0,
-                        'bbox': {
-                            'x0': int(data['left'][i]),
-                            'y0': int(data['top'][i]),
-                            'x1': int(data['left'][i]) + int(data['width'][i]),
-                            'y1': int(data['top'][i]) + int(data['height'][i])
-                        }
-                    }
-                    words.append(word_data)
-
-                    # Group words by line
-                    line_key = data['line_num'][i]
-                    if line_key not in lines:
-                        lines[line_key] = {
-                            'words': [],
-                            'bbox': {
-                                'x0': int(data['left'][i]),
-                                'y0': int(data['top'][i]),
-                                'x1': int(data['left'][i]) + int(data['width'][i]),
-                                'y1': int(data['top'][i]) + int(data['height'][i])
-                            }
-                        }
-                    lines[line_key]['words'].append(word_data)
-
-            # Create line-level data
-            lines_list = []
-            for line_num, line_data in sorted(lines.items()):
-                line_text = ' '.join([w['text'] for w in line_data['words']])
-                line_confidence = sum([w['confidence'] for w in line_data['words']]) / len(line_data['words']) if line_data['words'] else 0
-
-                lines_list.append({
-                    'text': line_text,
-                    'confidence': line_confidence,
-                    'bbox': line_data['bbox']
-                })
-
-            # Calculate overall confidence
-            overall_confidence = sum([w['confidence'] for w in words]) / len(words) if words else 0
+            parse_start = time.time()
+            parsed = self.parse_recognition_data(
+                data,
+                columnar=options.get('format') == 'columnar',
+                word_detail=options.get('word_detail', True) is not False
+            )
+            timings['parse'] = round((time.time() - parse_start) * 1000, 2)
 
             return {
                 'text': text.strip(),
-                'confidence': overall_confidence,
-                'words': words,
-                'lines': lines_list,
+                'confidence': parsed['confidence'],
+                'format': 'columnar' if options.get('format') == 'columnar' else 'objects',
+                'words': parsed['words'],
+                'lines': parsed['lines'],
                 'processingTime': processing_time,
                 'language': language,
+                'engine': engine,
+                'preprocessing': details['stages'],
+                'textBlocks': text_blocks,
+                'tiles': tiles,
+                'incremental': incremental,
+                'autoPreprocessing': details.get('auto'),
+                'stageTimings': timings,
                 'boundingBox': {
                     'x': 0,
                     'y': 0,
@@ -325,6 +1594,376 @@ class PythonOCRService:
             logger.error(f"OCR failed: {str(e)}")
             raise
 
+    @staticmethod
+    def parse_recognition_data(data: Dict[str, List[Any]], columnar: bool = False,
+                               word_detail: bool = True) -> Dict[str, Any]:
+        """Turn image_to_data-style columns into words, lines and overall confidence
+
+        Filtering, bbox math and per-line aggregates run on NumPy arrays. Lines
+        are keyed by (block, paragraph, line) when the engine reports them, and
+        a line bbox spans all of its words. The columnar form returns parallel
+        arrays (text, conf, x0, y0, x1, y1, line_id) instead of one object per
+        word; word_detail=False omits words altogether.
+        """
+        conf = np.asarray(data['conf'], dtype=np.float64)
+        keep = np.flatnonzero(np.trunc(conf) > 0)  # Only include confident words
+
+        texts = [str(data['text'][i]) for i in keep]
+        conf = conf[keep] / 100.0
+        x0 = np.asarray(data['left'], dtype=np.int64)[keep]
+        y0 = np.asarray(data['top'], dtype=np.int64)[keep]
+        x1 = x0 + np.asarray(data['width'], dtype=np.int64)[keep]
+        y1 = y0 + np.asarray(data['height'], dtype=np.int64)[keep]
+
+        # Group words by line (lexicographic key order is Tesseract's reading order)
+        key_columns = [np.asarray(data[key], dtype=np.int64)[keep]
+                       for key in ('block_num', 'par_num', 'line_num') if key in data]
+        if len(keep):
+            _, line_ids = np.unique(np.stack(key_columns, axis=1), axis=0, return_inverse=True)
+            line_ids = line_ids.reshape(-1)
+            line_count = int(line_ids.max()) + 1
+        else:
+            line_ids = np.zeros(0, dtype=np.int64)
+            line_count = 0
+
+        word_counts = np.bincount(line_ids, minlength=line_count)
+        line_conf = np.bincount(line_ids, weights=conf, minlength=line_count) / np.maximum(word_counts, 1)
+        line_x0 = np.full(line_count, np.iinfo(np.int64).max)
+        line_y0 = np.full(line_count, np.iinfo(np.int64).max)
+        line_x1 = np.zeros(line_count, dtype=np.int64)
+        line_y1 = np.zeros(line_count, dtype=np.int64)
+        np.minimum.at(line_x0, line_ids, x0)
+        np.minimum.at(line_y0, line_ids, y0)
+        np.maximum.at(line_x1, line_ids, x1)
+        np.maximum.at(line_y1, line_ids, y1)
+
+        # Words stay in recognition order within each line
+        order = np.argsort(line_ids, kind='stable')
+        boundaries = np.cumsum(word_counts)[:-1] if line_count else []
+        line_texts = [' '.join(texts[i] for i in group) for group in np.split(order, boundaries)] if line_count else []
+
+        overall_confidence = float(conf.mean()) if len(conf) else 0
+
+        if columnar:
+            words = {
+                'text': texts,
+                'conf': conf.tolist(),
+                'x0': x0.tolist(),
+                'y0': y0.tolist(),
+                'x1': x1.tolist(),
+                'y1': y1.tolist(),
+                'line_id': line_ids.tolist()
+            } if word_detail else None
+            lines = {
+                'text': line_texts,
+                'conf': line_conf.tolist(),
+                'x0': line_x0.tolist(),
+                'y0': line_y0.tolist(),
+                'x1': line_x1.tolist(),
+                'y1': line_y1.tolist()
+            }
+            return {'confidence': overall_confidence, 'words': words, 'lines': lines}
+
+        words = [
+            {'text': text, 'confidence': confidence, 'bbox': {'x0': left, 'y0': top, 'x1': right, 'y1': bottom}}
+            for text, confidence, left, top, right, bottom
+            in zip(texts, conf.tolist(), x0.tolist(), y0.tolist(), x1.tolist(), y1.tolist())
+        ] if word_detail else None
+        lines = [
+            {'text': text, 'confidence': confidence, 'bbox': {'x0': left, 'y0': top, 'x1': right, 'y1': bottom}}
+            for text, confidence, left, top, right, bottom
+            in zip(line_texts, line_conf.tolist(), line_x0.tolist(), line_y0.tolist(), line_x1.tolist(), line_y1.tolist())
+        ]
+        return {'confidence': overall_confidence, 'words': words, 'lines': lines}
+
+    def detect_text_blocks(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """Find candidate text blocks with a morphological gradient and contours
+
+        Character edges are joined horizontally into words and lines, and
+        nearby boxes are merged so a block keeps enough context for layout
+        analysis. Returns padded (x, y, w, h) boxes in reading order.
+        """
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        img_h, img_w = gray.shape[:2]
+
+        gradient = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+        _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        join_width = max(9, img_w // 100)
+        connected = cv2.morphologyEx(binary, cv2.MORPH_CLOSE,
+                                     cv2.getStructuringElement(cv2.MORPH_RECT, (join_width, 1)))
+        contours, _ = cv2.findContours(connected, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        boxes = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            if h < 6 or w < 6 or h > img_h * 0.8:
+                continue
+            # Text regions are dense in edges; photos and rules are not
+            fill = cv2.countNonZero(binary[y:y+h, x:x+w]) / float(w * h)
+            if fill < 0.1:
+                continue
+            boxes.append([x, y, x + w, y + h])
+
+        # Merge boxes closer than a line gap until nothing changes
+        gap = max(4, join_width // 2)
+        merged = True
+        while merged and len(boxes) > 1:
+            merged = False
+            result = []
+            while boxes:
+                current = boxes.pop()
+                index = 0
+                while index < len(boxes):
+                    other = boxes[index]
+                    if other[0] <= current[2] + gap and current[0] <= other[2] + gap and \
+                            other[1] <= current[3] + gap and current[1] <= other[3] + gap:
+                        current = [min(current[0], other[0]), min(current[1], other[1]),
+                                   max(current[2], other[2]), max(current[3], other[3])]
+                        boxes.pop(index)
+                        merged = True
+                    else:
+                        index += 1
+                result.append(current)
+            boxes = result
+
+        padded = []
+        for x0, y0, x1, y1 in boxes:
+            x0 = max(0, x0 - DETECTION_BLOCK_PADDING)
+            y0 = max(0, y0 - DETECTION_BLOCK_PADDING)
+            x1 = min(img_w, x1 + DETECTION_BLOCK_PADDING)
+            y1 = min(img_h, y1 + DETECTION_BLOCK_PADDING)
+            padded.append((x0, y0, x1 - x0, y1 - y0))
+
+        return sorted(padded, key=lambda box: (box[1], box[0]))
+
+    def recognize_text_blocks(self, image: np.ndarray, options: Dict[str, Any], config_string: str
+                              ) -> Tuple[Dict[str, List[Any]], str, str, Optional[List[Dict[str, int]]]]:
+        """Recognize only detected text blocks, in parallel, in full-image coordinates
+
+        Falls back to one whole-image pass when the blocks cover most of the
+        image or are too many for per-block calls to pay off.
+        """
+        blocks = self.detect_text_blocks(image)
+        covered = sum(w * h for _, _, w, h in blocks)
+        pooled = self.engine_pool.available and options.get('engine', 'auto') != 'pytesseract'
+        max_blocks = DETECTION_MAX_BLOCKS if pooled else DETECTION_MAX_BLOCKS_SUBPROCESS
+        if not blocks or len(blocks) > max_blocks or \
+                covered > DETECTION_MAX_COVERAGE * image.shape[0] * image.shape[1]:
+            data, text, engine = self.run_recognition(image, options, config_string)
+            return data, text, engine, None
+
+        futures = [
+            self.block_executor.submit(self.run_recognition, image[y:y+h, x:x+w], options, config_string)
+            for x, y, w, h in blocks
+        ]
+
+        merged = {key: [] for key in ('text', 'conf', 'left', 'top', 'width', 'height', 'line_num')}
+        texts = []
+        engine = 'pytesseract'
+        line_offset = 0
+        for (x, y, _, _), future in zip(blocks, futures):
+            data, text, engine = future.result()
+            if text.strip():
+                texts.append(text.strip())
+
+            # Renumber lines so each block's lines stay distinct
+            line_ids: Dict[Tuple[int, ...], int] = {}
+            for i in range(len(data['text'])):
+                line_key = tuple(data[key][i] for key in ('block_num', 'par_num', 'line_num') if key in data)
+                if line_key not in line_ids:
+                    line_ids[line_key] = line_offset + len(line_ids) + 1
+                merged['text'].append(data['text'][i])
+                merged['conf'].append(data['conf'][i])
+                merged['left'].append(int(data['left'][i]) + x)
+                merged['top'].append(int(data['top'][i]) + y)
+                merged['width'].append(data['width'][i])
+                merged['height'].append(data['height'][i])
+                merged['line_num'].append(line_ids[line_key])
+            line_offset += len(line_ids)
+
+        text_blocks = [{'x': x, 'y': y, 'width': w, 'height': h} for x, y, w, h in blocks]
+        return merged, '\n'.join(texts), engine, text_blocks
+
+    @staticmethod
+    def band_geometry(options: Dict[str, Any], default_height: int, default_overlap: int) -> Tuple[int, int]:
+        """Validated (tile_height, tile_overlap) of a request; raises ValueError on bad values"""
+        tile_height = int(options.get('tile_height', default_height))
+        overlap = int(options.get('tile_overlap', default_overlap))
+        if tile_height < MIN_TILE_HEIGHT:
+            raise ValueError(f'tile_height must be at least {MIN_TILE_HEIGHT} px')
+        if not 0 <= overlap < tile_height:
+            raise ValueError('tile_overlap must be at least 0 and smaller than tile_height')
+        return tile_height, overlap
+
+    def check_tiling_options(self, options: Dict[str, Any]):
+        """Reject band options before any decoding or recognition work is done"""
+        if options.get('session'):
+            self.band_geometry(options, INCREMENTAL_TILE_HEIGHT, INCREMENTAL_TILE_OVERLAP)
+        elif options.get('tiling'):
+            self.band_geometry(options, DEFAULT_TILE_HEIGHT, DEFAULT_TILE_OVERLAP)
+
+    def should_tile(self, image: np.ndarray, options: Dict[str, Any]) -> bool:
+        """Tile when requested, or in 'auto' mode when the image spans several bands"""
+        tiling = options.get('tiling', False)
+        if not tiling:
+            return False
+        tile_height, _ = self.band_geometry(options, DEFAULT_TILE_HEIGHT, DEFAULT_TILE_OVERLAP)
+        if tiling == 'auto':
+            return image.shape[0] > 2 * tile_height
+        return image.shape[0] > tile_height
+
+    @staticmethod
+    def tile_bands(img_h: int, tile_height: int, overlap: int) -> List[Tuple[int, int]]:
+        """(top, bottom) of overlapping horizontal bands covering the image"""
+        if tile_height < 1 or overlap < 0:
+            raise ValueError('tile_height must be positive and tile_overlap non-negative')
+        overlap = min(overlap, tile_height // 2)
+        bands = []
+        top = 0
+        while True:
+            bottom = min(img_h, top + tile_height)
+            bands.append((top, bottom))
+            if bottom >= img_h:
+                return bands
+            top += tile_height - overlap
+
+    @staticmethod
+    def merge_bands(bands: List[Tuple[int, int]], results: List[Dict[str, List[Any]]],
+                    img_h: int) -> Tuple[Dict[str, List[Any]], str]:
+        """Merge per-band recognition data into global coordinates
+
+        Each word is kept only by the band that owns its vertical center; band
+        ownership splits every overlap at its midpoint, so words seen twice in
+        an overlap zone are reported once.
+        """
+        merged = {key: [] for key in ('text', 'conf', 'left', 'top', 'width', 'height', 'line_num')}
+        line_texts: Dict[int, List[str]] = {}
+        line_offset = 0
+        for index, ((top, bottom), data) in enumerate(zip(bands, results)):
+            own_top = 0 if index == 0 else (top + bands[index - 1][1]) / 2
+            own_bottom = img_h if index == len(bands) - 1 else (bottom + bands[index + 1][0]) / 2
+
+            line_ids: Dict[Tuple[int, ...], int] = {}
+            for i in range(len(data['text'])):
+                if float(data['conf'][i]) <= 0 or not str(data['text'][i]).strip():
+                    continue
+                word_top = int(data['top'][i]) + top
+                center = word_top + int(data['height'][i]) / 2
+                if not own_top <= center < own_bottom:
+                    continue
+
+                line_key = tuple(data[key][i] for key in ('block_num', 'par_num', 'line_num') if key in data)
+                if line_key not in line_ids:
+                    line_ids[line_key] = line_offset + len(line_ids) + 1
+                line_id = line_ids[line_key]
+
+                merged['text'].append(data['text'][i])
+                merged['conf'].append(data['conf'][i])
+                merged['left'].append(int(data['left'][i]))
+                merged['top'].append(word_top)
+                merged['width'].append(data['width'][i])
+                merged['height'].append(data['height'][i])
+                merged['line_num'].append(line_id)
+                line_texts.setdefault(line_id, []).append(str(data['text'][i]))
+            line_offset += len(line_ids)
+
+        text = '\n'.join(' '.join(line_texts[line_id]) for line_id in sorted(line_texts))
+        return merged, text
+
+    def recognize_tiles(self, image: np.ndarray, options: Dict[str, Any], config_string: str
+                        ) -> Tuple[Dict[str, List[Any]], str, str, List[Dict[str, int]]]:
+        """OCR overlapping horizontal bands concurrently and merge them in global coordinates"""
+        img_h = image.shape[0]
+        bands = self.tile_bands(img_h, *self.band_geometry(options, DEFAULT_TILE_HEIGHT, DEFAULT_TILE_OVERLAP))
+
+        futures = [
+            self.block_executor.submit(self.run_recognition, image[top:bottom], options, config_string)
+            for top, bottom in bands
+        ]
+        results = []
+        engine = 'pytesseract'
+        for future in futures:
+            data, _, engine = future.result()
+            results.append(data)
+
+        merged, text = self.merge_bands(bands, results, img_h)
+        tiles = [{'y': top, 'height': bottom - top} for top, bottom in bands]
+        return merged, text, engine, tiles
+
+    def recognize_incremental(self, image: np.ndarray, options: Dict[str, Any], config_string: str,
+                              session: str) -> Tuple[Dict[str, List[Any]], str, str, Dict[str, Any]]:
+        """OCR a new capture of a session's page, re-recognizing only bands whose pixels changed"""
+        img_h, img_w = image.shape[:2]
+        bands = self.tile_bands(img_h, *self.band_geometry(options, INCREMENTAL_TILE_HEIGHT, INCREMENTAL_TILE_OVERLAP))
+        options_key = normalize_options(options)
+        previous = self.sessions.get_bands(session, options_key, img_w)
+
+        band_keys = []
+        futures = {}
+        for top, bottom in bands:
+            band = np.ascontiguousarray(image[top:bottom])
+            band_key = (top, bottom, hashlib.blake2b(band.data, digest_size=16).hexdigest())
+            band_keys.append(band_key)
+            if band_key not in previous and band_key not in futures:
+                futures[band_key] = self.block_executor.submit(self.run_recognition, band, options, config_string)
+
+        current = {}
+        engine = 'session'
+        for band_key in band_keys:
+            if band_key in futures:
+                data, _, engine = futures[band_key].result()
+                current[band_key] = data
+            else:
+                current[band_key] = previous[band_key]
+
+        merged, text = self.merge_bands(bands, [current[band_key] for band_key in band_keys], img_h)
+        self.sessions.put_bands(session, options_key, img_w, current,
+                                reused=len(band_keys) - len(futures), recognized=len(futures))
+
+        # Coalesce consecutive re-recognized bands into changed regions
+        changed_regions = []
+        for top, bottom, _ in (band_key for band_key in band_keys if band_key in futures):
+            if changed_regions and top <= changed_regions[-1]['y'] + changed_regions[-1]['height']:
+                changed_regions[-1]['height'] = bottom - changed_regions[-1]['y']
+            else:
+                changed_regions.append({'x': 0, 'y': top, 'width': img_w, 'height': bottom - top})
+
+        incremental = {
+            'session': session,
+            'firstCapture': not previous,
+            'bandsReused': len(band_keys) - len(futures),
+            'bandsRecognized': len(futures),
+            'changedRegions': changed_regions
+        }
+        return merged, text, engine, incremental
+
+    def run_recognition(self, image: np.ndarray, options: Dict[str, Any],
+                        config_string: str) -> Tuple[Dict[str, List[Any]], str, str]:
+        """Recognize once with a pooled engine, or fall back to pytesseract"""
+        if self.engine_pool.available and options.get('engine', 'auto') != 'pytesseract':
+            try:
+                data, text = self.engine_pool.recognize(
+                    image,
+                    language=options.get('language', 'eng'),
+                    psm=int(options.get('psm', 6)),
+                    oem=int(options.get('oem', 3)),
+                    whitelist=options.get('whitelist'),
+                    blacklist=options.get('blacklist')
+                )
+                return data, text, 'tesserocr'
+            except Exception as e:
+                logger.warning(f"Pooled Tesseract engine failed, falling back to pytesseract: {str(e)}")
+
+        data = pytesseract.image_to_data(
+            image,
+            config=config_string,
+            output_type=pytesseract.Output.DICT
+        )
+
+        text = pytesseract.image_to_string(image, config=config_string)
+
+        return data, text, 'pytesseract'
+
     def get_available_languages(self) -> List[str]:
         """Get list of available Tesseract languages"""
         try:
@@ -334,10 +1973,31 @@ class PythonOCRService:
             logger.error(f"Failed to get languages: {str(e)}")
             return ['eng', 'por']  # Fallback
 
+    def configure_thread_limits(self):
+        """Split the cores between workers so Tesseract/OpenCV don't oversubscribe the CPU"""
+        threads_per_worker = max(1, (os.cpu_count() or 1) // self.workers)
+        # Read by Tesseract's OpenMP runtime (in-process and pytesseract subprocesses)
+        os.environ['OMP_THREAD_LIMIT'] = str(threads_per_worker)
+        cv2.setNumThreads(threads_per_worker)
+        return threads_per_worker
+
     def start(self):
         """Start the OCR service server"""
         try:
-            self.server = make_server(self.host, self.port, self.app)
+            if self.mode == 'production':
+                threads_per_worker = self.configure_thread_limits()
+                self.server = PooledWSGIServer(
+                    self.host, self.port, self.app,
+                    workers=self.workers,
+                    queue_size=self.queue_size
+                )
+                logger.info(
+                    f"Production mode: {self.workers} workers, queue of {self.queue_size}, "
+                    f"OMP_THREAD_LIMIT={threads_per_worker}"
+                )
+            else:
+                self.server = make_server(self.host, self.port, self.app)
+
             self.server_thread = threading.Thread(target=self.server.serve_forever)
             self.server_thread.daemon = True
             self.server_thread.start()
@@ -350,12 +2010,23 @@ class PythonOCRService:
             return False
 
     def stop(self):
-        """Stop the OCR service server"""
+        """Stop the OCR service server, draining in-flight requests in production mode"""
         try:
             if self.server:
+                # Stop accepting new connections first
                 self.server.shutdown()
+                if isinstance(self.server, PooledWSGIServer):
+                    self.server.drain(self.drain_timeout)
                 self.server.server_close()
                 logger.info("Python OCR Service stopped")
+            if self.batch_pool is not None:
+                self.batch_pool.shutdown(wait=True, cancel_futures=True)
+                self.batch_pool = None
+            self.region_executor.shutdown(wait=True)
+            self.block_executor.shutdown(wait=True)
+            self.validation_executor.shutdown(wait=True)
+            self.job_queue.close()
+            self.engine_pool.close()
             return True
         except Exception as e:
             logger.error(f"Failed to stop OCR service: {str(e)}")
@@ -364,10 +2035,10 @@ class PythonOCRService:
 # Global service instance
 ocr_service = None
 
-def start_service(host='localhost', port=5000):
+def start_service(host='localhost', port=5000, **kwargs):
     """Start the OCR service"""
     global ocr_service
-    ocr_service = PythonOCRService(host, port)
+    ocr_service = PythonOCRService(host, port, **kwargs)
     return ocr_service.start()
 
 def stop_service():
@@ -383,6 +2054,39 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Python OCR Service')
     parser.add_argument('--host', default='localhost', help='Host to bind to')
     parser.add_argument('--port', type=int, default=5000, help='Port to bind to')
+    parser.add_argument('--mode', choices=['development', 'production'], default='development',
+                        help='Serving mode (production uses a bounded worker pool)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker threads (default: CPU cores)')
+    parser.add_argument('--queue-size', type=int, default=None,
+                        help='Requests allowed to wait for a worker (default: 4x workers)')
+    parser.add_argument('--batch-workers', type=int, default=None,
+                        help='Processes for /extract/batch (default: CPU cores)')
+    parser.add_argument('--cache-entries', type=int, default=512,
+                        help='OCR results kept in memory (0 disables the cache)')
+    parser.add_argument('--cache-mb', type=float, default=64, help='Memory budget of the OCR result cache')
+    parser.add_argument('--cache-dir', default=None, help='Optional on-disk OCR result cache directory')
+    parser.add_argument('--cache-phash-distance', type=int, default=None,
+                        help='Enable perceptual-hash hits within this Hamming distance')
+    parser.add_argument('--max-sessions', type=int, default=64,
+                        help='Incremental OCR sessions kept in memory')
+    parser.add_argument('--session-ttl', type=float, default=1800.0,
+                        help='Seconds an idle incremental OCR session is kept')
+    parser.add_argument('--job-workers', type=int, default=None,
+                        help='Worker threads for the /jobs queue (default: --workers)')
+    parser.add_argument('--job-queue-size', type=int, default=64,
+                        help='Jobs allowed to wait in the /jobs queue before submissions are rejected')
+    parser.add_argument('--job-ttl', type=float, default=600.0,
+                        help='Seconds finished job results are kept')
+    parser.add_argument('--max-image-mb', type=float, default=DEFAULT_MAX_IMAGE_BYTES / (1024 * 1024),
+                        help='Largest encoded image accepted per request')
+    parser.add_argument('--max-image-pixels', type=int, default=DEFAULT_MAX_IMAGE_PIXELS,
+                        help='Pixel budget per decoded image (larger images are decoded reduced)')
+    parser.add_argument('--llm-url', default=DEFAULT_LLM_URL,
+                        help='LLM server used by /pipeline/validate')
+    parser.add_argument('--validation-workers', type=int, default=DEFAULT_VALIDATION_WORKERS,
+                        help='Concurrent /validate calls made by /pipeline/validate')
+    parser.add_argument('--drain-timeout', type=float, default=30.0,
+                        help='Seconds to wait for in-flight requests on shutdown')
 
     args = parser.parse_args()
 
@@ -407,7 +2111,16 @@ if __name__ == '__main__':
         sys.exit(1)
 
     # Start service
-    if start_service(args.host, args.port):
+    if start_service(args.host, args.port, mode=args.mode, workers=args.workers,
+                     queue_size=args.queue_size, drain_timeout=args.drain_timeout,
+                     batch_workers=args.batch_workers, cache_entries=args.cache_entries,
+                     cache_mb=args.cache_mb, cache_dir=args.cache_dir,
+                     cache_phash_distance=args.cache_phash_distance,
+                     max_sessions=args.max_sessions, session_ttl=args.session_ttl,
+                     job_workers=args.job_workers, job_queue_size=args.job_queue_size, job_ttl=args.job_ttl,
+                     max_image_bytes=int(args.max_image_mb * 1024 * 1024),
+                     max_image_pixels=args.max_image_pixels, llm_url=args.llm_url,
+                     validation_workers=args.validation_workers):
         print(f"OCR Service running on http://{args.host}:{args.port}")
         print("Press Ctrl+C to stop")
         try:
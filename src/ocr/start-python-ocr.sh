@@ -107,4 +107,5 @@ echo "Pressione Ctrl+C para parar"
 echo ""
 
 # Executar o serviço
-python3 python-ocr-service.py --host 0.0.0.0 --port 5000
+# OCR_MODE=production usa pool de workers dimensionado pelos núcleos da CPU
+python3 python-ocr-service.py --host 0.0.0.0 --port 5000 --mode "${OCR_MODE:-development}"
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Persistent Tesseract engine pool for the Python OCR Service
+Keeps initialized tesserocr API handles per (language, oem) so requests skip
+the process spawn, temp files and traineddata reload of pytesseract
+"""
+
+import os
+import queue
+import importlib.util
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# tesserocr is imported on first use so OMP_THREAD_LIMIT set by the serving
+# mode is in place before libtesseract/OpenMP initialize
+TESSEROCR_AVAILABLE = importlib.util.find_spec('tesserocr') is not None
+
+logger = logging.getLogger(__name__)
+
+class TesseractEnginePool:
+    """Pool of initialized Tesseract API handles keyed by (language, oem)"""
+
+    def __init__(self, max_engines_per_key: Optional[int] = None, tessdata_path: Optional[str] = None,
+                 acquire_timeout: float = 30.0):
+        self.max_engines_per_key = max_engines_per_key or os.cpu_count() or 1
+        self.tessdata_path = tessdata_path or os.environ.get('TESSDATA_PREFIX')
+        self.acquire_timeout = acquire_timeout
+        self.lock = threading.Lock()
+        self.idle: Dict[Tuple[str, int], queue.LifoQueue] = {}
+        self.created: Dict[Tuple[str, int], int] = {}
+        self.closed = False
+
+    @property
+    def available(self) -> bool:
+        return TESSEROCR_AVAILABLE and not self.closed
+
+    def create_engine(self, language: str, oem: int):
+        """Initialize a new API handle (loads traineddata once per handle)"""
+        from tesserocr import PyTessBaseAPI
+
+        kwargs = {'lang': language, 'oem': oem}
+        if self.tessdata_path:
+            kwargs['path'] = self.tessdata_path
+        engine = PyTessBaseAPI(**kwargs)
+        logger.info(f"Initialized Tesseract engine for lang={language} oem={oem}")
+        return engine
+
+    @contextmanager
+    def engine(self, language: str, oem: int):
+        """Check out an engine for (language, oem), creating one if the pool has room"""
+        key = (language, oem)
+        with self.lock:
+            if self.closed:
+                raise RuntimeError('Tesseract engine pool is closed')
+            idle = self.idle.setdefault(key, queue.LifoQueue())
+            engine = None
+            try:
+                engine = idle.get_nowait()
+            except queue.Empty:
+                if self.created.get(key, 0) < self.max_engines_per_key:
+                    # Reserve the slot now; initialization happens outside the lock
+                    self.created[key] = self.created.get(key, 0) + 1
+                    engine = False
+
+        if engine is False:
+            try:
+                engine = self.create_engine(language, oem)
+            except Exception:
+                with self.lock:
+                    self.created[key] -= 1
+                raise
+        elif engine is None:
+            engine = idle.get(timeout=self.acquire_timeout)
+
+        try:
+            yield engine
+        finally:
+            engine.Clear()
+            if self.closed:
+                engine.End()
+            else:
+                idle.put(engine)
+
+    def recognize(self, image: np.ndarray, language: str, psm: int, oem: int,
+                  whitelist: Optional[str] = None, blacklist: Optional[str] = None) -> Tuple[Dict[str, List[Any]], str]:
+        """Run a single recognition pass and return image_to_data-style columns plus full text"""
+        from tesserocr import RIL, iterate_level
+
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        channels = 1 if image.ndim == 2 else image.shape[2]
+
+        with self.engine(language, oem) as engine:
+            engine.SetPageSegMode(psm)
+            engine.SetVariable('tessedit_char_whitelist', whitelist or '')
+            engine.SetVariable('tessedit_char_blacklist', blacklist or '')
+            engine.SetImageBytes(image.tobytes(), width, height, channels, width * channels)
+            engine.Recognize()
+
+            # Text, words and lines all come from the same recognition result
+            text = engine.GetUTF8Text()
+            data = {key: [] for key in ('text', 'conf', 'left', 'top', 'width', 'height', 'line_num')}
+            line_num = 0
+            iterator = engine.GetIterator()
+            if iterator is not None:
+                for word in iterate_level(iterator, RIL.WORD):
+                    word_text = word.GetUTF8Text(RIL.WORD)
+                    if word_text is None:
+                        continue
+                    if word.IsAtBeginningOf(RIL.TEXTLINE):
+                        line_num += 1
+                    x0, y0, x1, y1 = word.BoundingBox(RIL.WORD)
+                    data['text'].append(word_text)
+                    data['conf'].append(word.Confidence(RIL.WORD))
+                    data['left'].append(x0)
+                    data['top'].append(y0)
+                    data['width'].append(x1 - x0)
+                    data['height'].append(y1 - y0)
+                    data['line_num'].append(line_num)
+
+        return data, text
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'available': self.available,
+                'engines': {f"{language}/oem{oem}": count for (language, oem), count in self.created.items()},
+                'idle': {f"{language}/oem{oem}": idle.qsize() for (language, oem), idle in self.idle.items()}
+            }
+
+    def close(self):
+        """Release idle API handles; checked-out handles are released when returned"""
+        engines = []
+        with self.lock:
+            self.closed = True
+            for idle in self.idle.values():
+                while not idle.empty():
+                    engines.append(idle.get_nowait())
+            self.idle.clear()
+            self.created.clear()
+        for engine in engines:
+            try:
+                engine.End()
+            except Exception as e:
+                logger.warning(f"Failed to release Tesseract engine: {str(e)}")
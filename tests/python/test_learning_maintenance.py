@@ -0,0 +1,57 @@
+"""Unit tests for the learning database maintenance of the LLM server"""
+
+import importlib.util
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('llama_cpp')
+pytest.importorskip('psutil')
+pytest.importorskip('yaml')
+
+SERVER_PATH = Path(__file__).resolve().parents[2] / 'llm-server-production.py'
+
+
+@pytest.fixture(scope='module')
+def server_module(tmp_path_factory):
+    # The server logs to logs/ relative to the working directory
+    workdir = tmp_path_factory.mktemp('llm-server')
+    (workdir / 'logs').mkdir()
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        spec = importlib.util.spec_from_file_location('llm_server_production', SERVER_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        yield module
+    finally:
+        os.chdir(previous)
+
+
+def test_compact_releases_vacuum_pages(server_module, tmp_path):
+    config = server_module.MaintenanceConfig(archive_enabled=False, vacuum_pages=100)
+    learning = server_module.LearningSystem(db_path=str(tmp_path / 'learning.db'), maintenance_config=config)
+
+    timestamp = datetime.now().isoformat()
+    with learning._connect() as conn:
+        conn.executemany("""
+            INSERT INTO validation_decisions
+                (id, timestamp, csv_value, web_value, field_type, model_used, match, confidence, hash_key)
+            VALUES (?, ?, ?, ?, 'text', 'test', 1, 0.9, ?)
+        """, [(str(uuid.uuid4()), timestamp, 'x' * 2000, 'y' * 2000, str(index)) for index in range(2000)])
+        conn.commit()
+        conn.execute("DELETE FROM validation_decisions")
+        conn.commit()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    assert free_before > 2 * config.vacuum_pages
+
+    learning._compact()
+
+    with learning._connect() as conn:
+        free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    assert free_before - free_after == pytest.approx(config.vacuum_pages, abs=5)
@@ -0,0 +1,55 @@
+"""Unit tests for the auto preprocessing statistics of the Python OCR Service (src/ocr)"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+pytest.importorskip('flask')
+pytest.importorskip('pytesseract')
+
+import numpy as np
+
+OCR_DIR = Path(__file__).resolve().parents[2] / 'src' / 'ocr'
+sys.path.insert(0, str(OCR_DIR))
+
+spec = importlib.util.spec_from_file_location('python_ocr_service', OCR_DIR / 'python-ocr-service.py')
+service_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(service_module)
+PythonOCRService = service_module.PythonOCRService
+
+
+@pytest.fixture(scope='module')
+def service():
+    instance = PythonOCRService(workers=1, cache_entries=0)
+    yield instance
+    instance.stop()
+
+
+def text_page(background: int, ink: int) -> np.ndarray:
+    """Mostly empty page with a few lines of ~28 px text"""
+    page = np.full((1400, 1000), background, dtype=np.uint8)
+    for line in range(6):
+        cv2.putText(page, f'Nome: Maria Silva {line} CPF 123.456.789-0{line}', (40, 80 + line * 60),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, ink, 2, cv2.LINE_AA)
+    return page
+
+
+@pytest.mark.parametrize('profile', ['fast', 'accurate'])
+def test_white_page_with_black_text_needs_no_contrast_fix(service, profile):
+    page = text_page(255, 0)
+    assert (page < 128).mean() < 0.02
+
+    stats = service.analyze_image(page)
+    plan = service.plan_auto_preprocessing(stats, profile)
+    assert stats['contrastSpread'] > 150
+    assert not plan['enhance_contrast']
+    assert not plan['threshold']
+
+
+def test_faint_text_gets_contrast_enhancement(service):
+    stats = service.analyze_image(text_page(200, 150))
+    assert stats['contrastSpread'] < 60
+    assert service.plan_auto_preprocessing(stats, 'accurate')['enhance_contrast']
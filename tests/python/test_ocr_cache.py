@@ -0,0 +1,31 @@
+"""Unit tests for the OCR result cache keys of the Python OCR Service (src/ocr)"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('cv2')
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'src' / 'ocr'))
+
+import numpy as np
+
+from ocr_cache import OCRResultCache, normalize_options
+
+IMAGE = np.full((40, 120), 255, dtype=np.uint8)
+
+
+@pytest.mark.parametrize('options, changed', [
+    ({'denoise': True}, {'denoise': True, 'denoise_strength': 15}),
+    ({'denoise': True}, {'denoise': True, 'denoise_method': 'median'}),
+    ({}, {'engine': 'pytesseract'}),
+])
+def test_result_affecting_options_change_the_key(options, changed):
+    cache = OCRResultCache()
+    assert cache.make_key(IMAGE, options)[0] != cache.make_key(IMAGE, changed)[0]
+    assert normalize_options(options) != normalize_options(changed)
+
+
+def test_explicit_defaults_share_the_key():
+    assert normalize_options({}) == normalize_options({'denoise_strength': '3', 'engine': 'auto'})
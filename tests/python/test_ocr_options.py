@@ -0,0 +1,49 @@
+"""Unit tests for header/form option coercion of the Python OCR Service (src/ocr)"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('cv2')
+pytest.importorskip('flask')
+pytest.importorskip('pytesseract')
+
+OCR_DIR = Path(__file__).resolve().parents[2] / 'src' / 'ocr'
+sys.path.insert(0, str(OCR_DIR))
+
+spec = importlib.util.spec_from_file_location('python_ocr_service', OCR_DIR / 'python-ocr-service.py')
+service_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(service_module)
+PythonOCRService = service_module.PythonOCRService
+
+
+@pytest.mark.parametrize('key, value', [
+    ('whitelist', '1234567890'),
+    ('whitelist', '0123456789'),
+    ('blacklist', '-0'),
+    ('language', 'eng+por'),
+    ('session', '42'),
+])
+def test_text_options_stay_strings(key, value):
+    assert PythonOCRService.coerce_option_value(key, value) == value
+
+
+@pytest.mark.parametrize('key, value, expected', [
+    ('psm', '7', 7),
+    ('scale', '1.5', 1.5),
+    ('tile_overlap', '0', 0),
+    ('denoise', 'true', True),
+    ('tiling', '0', False),
+    ('crop_region', '{"left": 1, "top": 2, "width": 3, "height": 4}',
+     {'left': 1, 'top': 2, 'width': 3, 'height': 4}),
+])
+def test_known_options_are_converted(key, value, expected):
+    assert PythonOCRService.coerce_option_value(key, value) == expected
+
+
+@pytest.mark.parametrize('key, value', [('psm', 'seven'), ('denoise', 'maybe'), ('crop_region', '{left')])
+def test_invalid_typed_options_are_rejected(key, value):
+    with pytest.raises(ValueError):
+        PythonOCRService.coerce_option_value(key, value)
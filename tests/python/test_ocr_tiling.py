@@ -0,0 +1,78 @@
+"""Unit tests for the band geometry of the Python OCR Service (src/ocr)"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('cv2')
+pytest.importorskip('flask')
+pytest.importorskip('pytesseract')
+
+OCR_DIR = Path(__file__).resolve().parents[2] / 'src' / 'ocr'
+sys.path.insert(0, str(OCR_DIR))
+
+spec = importlib.util.spec_from_file_location('python_ocr_service', OCR_DIR / 'python-ocr-service.py')
+service_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(service_module)
+PythonOCRService = service_module.PythonOCRService
+
+
+@pytest.fixture(scope='module')
+def service():
+    instance = PythonOCRService(workers=1, cache_entries=0)
+    yield instance
+    instance.stop()
+
+
+def test_tile_bands_single_band_when_image_fits():
+    assert PythonOCRService.tile_bands(500, 1200, 100) == [(0, 500)]
+    assert PythonOCRService.tile_bands(1200, 1200, 100) == [(0, 1200)]
+
+
+def test_tile_bands_cover_image_with_overlap():
+    bands = PythonOCRService.tile_bands(3000, 1200, 100)
+    assert bands == [(0, 1200), (1100, 2300), (2200, 3000)]
+    for (_, bottom), (top, _) in zip(bands, bands[1:]):
+        assert bottom - top == 100
+
+
+def test_tile_bands_clamps_overlap_to_half_band():
+    bands = PythonOCRService.tile_bands(1000, 400, 399)
+    assert bands == [(0, 400), (200, 600), (400, 800), (600, 1000)]
+
+
+@pytest.mark.parametrize('tile_height, overlap', [(0, 0), (-5, 0), (400, -1)])
+def test_tile_bands_rejects_degenerate_geometry(tile_height, overlap):
+    with pytest.raises(ValueError):
+        PythonOCRService.tile_bands(3000, tile_height, overlap)
+
+
+@pytest.mark.parametrize('options', [
+    {'tile_height': 0},
+    {'tile_height': 1},
+    {'tile_height': service_module.MIN_TILE_HEIGHT - 1},
+    {'tile_height': 400, 'tile_overlap': -1},
+    {'tile_height': 400, 'tile_overlap': 400},
+    {'tile_height': 'tall'},
+])
+def test_band_geometry_rejects_bad_options(options):
+    with pytest.raises(ValueError):
+        PythonOCRService.band_geometry(options, 1200, 100)
+
+
+def test_band_geometry_defaults_and_minimum():
+    assert PythonOCRService.band_geometry({}, 1200, 100) == (1200, 100)
+    minimum = service_module.MIN_TILE_HEIGHT
+    assert PythonOCRService.band_geometry({'tile_height': minimum, 'tile_overlap': 0}, 1200, 100) == (minimum, 0)
+
+
+@pytest.mark.parametrize('options', [
+    {'tiling': True, 'tile_height': 0},
+    {'session': 'page-1', 'tile_height': 0},
+    {'session': 'page-1', 'tile_height': 256, 'tile_overlap': 256},
+])
+def test_check_tiling_options_covers_tiled_and_session_requests(service, options):
+    with pytest.raises(ValueError):
+        service.check_tiling_options(options)